@@ -22,6 +22,8 @@ from app.database import Base, DATABASE_URL
 # Explicitly import all of your models
 from app.models.user_model import User
 from app.models.school_models import Class, Student
+from app.models.email_model import OutboundEmail
+from app.models.cache_model import ResponseCacheVersion
 
 # Set the target_metadata to your Base's metadata
 target_metadata = Base.metadata
@@ -0,0 +1,33 @@
+"""Add response cache versions table
+
+Revision ID: 5d2f8c41a9e3
+Revises: 3c5e9b1d7f20
+Create Date: 2026-10-18 16:02:44.905117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8c41a9e3'
+down_revision: Union[str, Sequence[str], None] = '3c5e9b1d7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('response_cache_versions',
+    sa.Column('scope', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('bumped_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('response_cache_versions')
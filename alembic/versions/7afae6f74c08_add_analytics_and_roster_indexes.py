@@ -0,0 +1,39 @@
+"""Add indexes for analytics and roster queries
+
+Revision ID: 7afae6f74c08
+Revises: e0362d908a72
+Create Date: 2026-10-18 10:12:31.482917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7afae6f74c08'
+down_revision: Union[str, Sequence[str], None] = 'e0362d908a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Foreign-key lookups use the leading column of the composite indexes, so
+    # students.class_id, skills.student_id and milestones.student_id get no
+    # single-column index of their own.
+    op.create_index('ix_students_class_id_is_archived', 'students', ['class_id', 'is_archived'], unique=False)
+    op.create_index(op.f('ix_skills_name'), 'skills', ['name'], unique=False)
+    op.create_index('ix_skills_student_id_name_status', 'skills', ['student_id', 'name', 'current_status'], unique=False)
+    op.create_index(op.f('ix_milestones_timestamp'), 'milestones', ['timestamp'], unique=False)
+    op.create_index('ix_milestones_student_id_timestamp', 'milestones', ['student_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_milestones_student_id_timestamp', table_name='milestones')
+    op.drop_index(op.f('ix_milestones_timestamp'), table_name='milestones')
+    op.drop_index('ix_skills_student_id_name_status', table_name='skills')
+    op.drop_index(op.f('ix_skills_name'), table_name='skills')
+    op.drop_index('ix_students_class_id_is_archived', table_name='students')
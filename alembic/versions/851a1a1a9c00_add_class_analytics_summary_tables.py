@@ -0,0 +1,82 @@
+"""Add class analytics summary tables
+
+Revision ID: 851a1a1a9c00
+Revises: 7afae6f74c08
+Create Date: 2026-10-18 11:04:52.730114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '851a1a1a9c00'
+down_revision: Union[str, Sequence[str], None] = '7afae6f74c08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('class_skill_summary',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('skill_name', sa.String(length=50), nullable=False),
+    sa.Column('red', sa.Integer(), nullable=False),
+    sa.Column('yellow', sa.Integer(), nullable=False),
+    sa.Column('green', sa.Integer(), nullable=False),
+    sa.Column('gold', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('class_id', 'skill_name', name='uq_class_skill_summary_class_id_skill_name')
+    )
+    op.create_index(op.f('ix_class_skill_summary_id'), 'class_skill_summary', ['id'], unique=False)
+    op.create_table('class_weighted_summary',
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('red', sa.Integer(), nullable=False),
+    sa.Column('yellow', sa.Integer(), nullable=False),
+    sa.Column('green', sa.Integer(), nullable=False),
+    sa.Column('gold', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.PrimaryKeyConstraint('class_id')
+    )
+
+    # Backfill from the base tables; same rules as app.crud.summary_crud.rebuild_summary
+    op.execute("""
+        INSERT INTO class_skill_summary (class_id, skill_name, red, yellow, green, gold)
+        SELECT st.class_id, sk.name,
+               SUM(CASE WHEN sk.current_status = 'RED' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN sk.current_status = 'YELLOW' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN sk.current_status = 'GREEN' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN sk.current_status = 'GOLD' THEN 1 ELSE 0 END)
+        FROM skills sk JOIN students st ON sk.student_id = st.id
+        WHERE st.class_id IS NOT NULL AND sk.current_status IS NOT NULL
+        GROUP BY st.class_id, sk.name
+    """)
+    op.execute("""
+        INSERT INTO class_weighted_summary (class_id, red, yellow, green, gold)
+        SELECT scores.class_id,
+               SUM(CASE WHEN scores.score < 2.0 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN scores.score >= 2.0 AND scores.score < 2.6 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN scores.score >= 2.6 AND scores.score < 3.3 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN scores.score >= 3.3 THEN 1 ELSE 0 END)
+        FROM (
+            SELECT st.class_id AS class_id,
+                   COALESCE(AVG(CASE sk.current_status
+                       WHEN 'RED' THEN 1 WHEN 'YELLOW' THEN 2 WHEN 'GREEN' THEN 3 WHEN 'GOLD' THEN 4
+                   END), 1.0) AS score
+            FROM students st LEFT JOIN skills sk ON sk.student_id = st.id
+            WHERE st.class_id IS NOT NULL
+            GROUP BY st.id, st.class_id
+        ) scores
+        GROUP BY scores.class_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('class_weighted_summary')
+    op.drop_index(op.f('ix_class_skill_summary_id'), table_name='class_skill_summary')
+    op.drop_table('class_skill_summary')
@@ -0,0 +1,148 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from fastapi import Depends, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.async_database import async_engine, get_async_db
+from app.crud import export_crud, student_crud
+from app.database import SessionLocal
+from app import export_cache
+from app.dependencies import get_current_user
+from app.models.user_model import User
+from app.main import app as flask_app
+from app.routes.auth_routes import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token
+from app import email_utils, passwords, pdf_pool
+
+# ASGI entry point: `uvicorn app.asgi:app`.
+# A thin shim over the Flask app, not a second implementation of the API.
+# Only the two routes that pin a thread on slow CPU work are served here:
+# login (async engine, bcrypt on the password pool) and the student PDF
+# export (report data on the threadpool, reportlab on the PDF pool). Every
+# other route, analytics included, goes to the Flask app mounted underneath,
+# so the response cache, ETags and replica routing behave the same under
+# uvicorn as under gunicorn. The read paths stay on the sync CRUD; moving
+# them to AsyncSession would mean an async CRUD layer, and
+# benchmarks/asgi_vs_flask.py measures what the shim costs in the meantime.
+
+# Threads for the blocking WSGI routes
+WSGI_WORKERS = int(os.getenv("WSGI_WORKERS") or 10)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(email_utils.start_worker_if_pending)
+    try:
+        yield
+    finally:
+        email_utils.get_mail_worker().stop(timeout=10)
+        pdf_pool.shutdown()
+        passwords.shutdown()
+        await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
+# Allow all origins for now to prevent blocking, restrict in production if needed
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"], expose_headers=["X-Next-Cursor"])
+
+# Same rule as the Flask blueprints: everything but login needs a bearer token
+PROTECTED = [Depends(get_current_user)]
+
+def _not_found(detail: str):
+    return JSONResponse({"detail": detail}, status_code=404)
+
+# --- Export ---
+def _load_student_report(student_id: int):
+    # Version and report snapshot from one sync session; runs on the threadpool
+    db = SessionLocal()
+    try:
+        student = student_crud.get_student_by_id(db, student_id=student_id)
+        if student is None:
+            return None, None
+        return export_crud.get_student_data_version(db, student), export_crud.student_report_data(student)
+    finally:
+        db.close()
+
+def _store_pdf(pdf_bytes: bytes, student_id: int, key: str):
+    with export_cache.open_artifact_spool() as spool:
+        spool.write(pdf_bytes)
+    return export_cache.store_artifact(spool.name, "student_pdf", student_id, key, "pdf")
+
+@app.get("/api/export/student/{student_id}/pdf", dependencies=PROTECTED)
+async def export_student_as_pdf(student_id: int, request: Request):
+    version, report = await run_in_threadpool(_load_student_report, student_id)
+    if version is None:
+        return _not_found("Student not found")
+
+    key = export_cache.artifact_key("student_pdf", student_id, version)
+    etag = f'"{key}"'
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    loop = asyncio.get_running_loop()
+    path = export_cache.get_artifact("student_pdf", student_id, key, "pdf")
+    if path is None:
+        # Rendering is CPU-bound: keep it off the event loop and out of the GIL
+        pdf_bytes = await loop.run_in_executor(pdf_pool.get_pool(), export_crud.render_student_pdf, report)
+        path = await loop.run_in_executor(None, _store_pdf, pdf_bytes, student_id, key)
+
+    # FileResponse answers Range requests itself
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=f"student_{student_id}_report.pdf",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+# --- Auth ---
+@app.post("/token")
+async def login_for_access_token(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Same contract as the Flask route: JSON body or urlencoded form
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+    else:
+        data = dict(parse_qsl(body.decode("utf-8", errors="replace")))
+    if not isinstance(data, dict):
+        data = {}
+
+    username = data.get("username") or data.get("email")
+    password = data.get("password")
+    if not username or not password:
+        return JSONResponse({"detail": "Missing username or password"}, status_code=400)
+
+    user = (await db.execute(select(User).where(User.email == username))).scalars().first()
+    if user is None:
+        return JSONResponse({"detail": "Incorrect email or password"}, status_code=401)
+
+    # bcrypt is deliberately slow; it runs on the password pool while other requests keep flowing
+    try:
+        verified, new_hash = await asyncio.wrap_future(passwords.submit_verify(password, user.hashed_password))
+    except passwords.PasswordPoolBusy:
+        return JSONResponse(
+            {"detail": "Too many login attempts in progress, try again shortly."},
+            status_code=503,
+            headers={"Retry-After": str(passwords.PASSWORD_HASH_RETRY_AFTER)},
+        )
+    if not verified:
+        return JSONResponse({"detail": "Incorrect email or password"}, status_code=401)
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
+    access_token = create_access_token(
+        data={"sub": user.email}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+# --- Everything else ---
+app.mount("/", WSGIMiddleware(flask_app, workers=WSGI_WORKERS))
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from flask import request, jsonify, g
+from jose import JWTError, jwt
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+
+from app.database import SessionLocal
+from app.crud import user_crud
+from app.models.user_model import User
+
+load_dotenv()
+
+# Configuration
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = os.getenv("ALGORITHM")
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES") or 10000)
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS") or 300)
+
+# Who a request is authenticated as; plain values, safe to share across
+# requests and threads unlike a session-bound User row.
+class Principal(NamedTuple):
+    id: int
+    email: str
+
+# --- Validated Token Cache ---
+# token -> (principal, expires_at). An entry lives for at most
+# AUTH_CACHE_TTL_SECONDS and never past the token's own `exp`, so a hit
+# needs neither the JWT decode nor the user lookup.
+_lock = threading.Lock()
+_principals = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+def _cached(token: str):
+    with _lock:
+        entry = _principals.get(token)
+        if entry is not None and entry[1] <= time.time():
+            del _principals[token]
+            entry = None
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        _principals.move_to_end(token)
+        _stats["hits"] += 1
+        return entry[0]
+
+def _store(token: str, principal: Principal, token_exp: float):
+    expires_at = min(time.time() + AUTH_CACHE_TTL_SECONDS, token_exp)
+    with _lock:
+        _principals[token] = (principal, expires_at)
+        _principals.move_to_end(token)
+        while len(_principals) > AUTH_CACHE_MAX_ENTRIES:
+            _principals.popitem(last=False)
+
+def invalidate_user(email: str):
+    with _lock:
+        tokens = [token for token, (principal, _) in _principals.items() if principal.email == email]
+        for token in tokens:
+            del _principals[token]
+        _stats["invalidations"] += len(tokens)
+
+def clear():
+    with _lock:
+        _principals.clear()
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"] = len(_principals)
+    return stats
+
+# Any ORM change to a user drops that user's cached tokens once the change
+# is committed. Evicting at flush time would let a concurrent request cache
+# the old row again before the commit, and would evict for nothing if the
+# transaction rolled back. Changes that bypass the ORM (bulk UPDATE/DELETE)
+# must call invalidate_user themselves.
+_PENDING_KEY = "auth_invalidate_emails"
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for target in (*session.dirty, *session.deleted):
+        if isinstance(target, User):
+            # Tokens name the user by email, so a renamed user's old address goes too
+            pending.update({target.email, *inspect(target).attrs.email.history.deleted})
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for email in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(email)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session):
+    session.info.pop(_PENDING_KEY, None)
+
+# Returns the Principal for a bearer token, or None if it is invalid,
+# expired or belongs to no user.
+def authenticate_token(token: str):
+    principal = _cached(token)
+    if principal is not None:
+        return principal
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    email = payload.get("sub")
+    if email is None or payload.get("exp") is None:
+        return None
+
+    db = SessionLocal()
+    try:
+        user = user_crud.get_user_by_email(db, email=email)
+        if user is None:
+            return None
+        principal = Principal(id=user.id, email=user.email)
+    finally:
+        db.close()
+
+    _store(token, principal, float(payload["exp"]))
+    return principal
+
+# --- Flask ---
+def _bearer_token():
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else None
+
+# before_request hook for blueprints that need a logged-in user; the
+# principal is available as g.current_user.
+def require_user():
+    if request.method == "OPTIONS":
+        # CORS preflights carry no credentials
+        return None
+    token = _bearer_token()
+    principal = authenticate_token(token) if token else None
+    if principal is None:
+        response = jsonify({"detail": "Could not validate credentials"})
+        response.headers["WWW-Authenticate"] = "Bearer"
+        return response, 401
+    g.current_user = principal
+    return None
@@ -1,26 +1,34 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, case
-from app.models.school_models import Student, Skill, Milestone, SkillStatus
-from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, cast, Date
+from app.models.school_models import Student, Skill, Milestone, SkillStatus, ClassSkillSummary, ClassWeightedSummary
+from datetime import date, datetime, timedelta
 
 # --- Weighted Score Calculation ---
 SCORE_MAP = {SkillStatus.RED: 1, SkillStatus.YELLOW: 2, SkillStatus.GREEN: 3, SkillStatus.GOLD: 4}
 
-def _get_student_weighted_score(student: Student):
-    if not student.skills:
-        return 1.0
-    total_score = sum(SCORE_MAP[skill.current_status] for skill in student.skills)
-    return total_score / len(student.skills)
-
 def _map_score_to_category(score: float):
     if 1.0 <= score < 2.0: return "red"
     if 2.0 <= score < 2.6: return "yellow"
     if 2.6 <= score < 3.3: return "green"
     return "gold"
 
+def _status_score_expr(status_column=Skill.current_status):
+    # SQL mirror of SCORE_MAP
+    return case(*[(status_column == status, score) for status, score in SCORE_MAP.items()])
+
+def _category_expr(score_column):
+    # SQL mirror of _map_score_to_category
+    return case(
+        (score_column < 2.0, "red"),
+        (score_column < 2.6, "yellow"),
+        (score_column < 3.3, "green"),
+        else_="gold",
+    )
+
 # --- A. Analytics by Skill ---
+# Reads the precomputed class_skill_summary rows (see summary_crud)
 def get_analytics_by_skill(db: Session, class_id: int):
-    skills_query = db.query(Skill.name, Skill.current_status, func.count(Skill.id)).join(Student).filter(Student.class_id == class_id).group_by(Skill.name, Skill.current_status).all()
+    summary_rows = db.query(ClassSkillSummary).filter(ClassSkillSummary.class_id == class_id).all()
     
     result = {
         "listening": {"red": 0, "yellow": 0, "green": 0, "gold": 0},
@@ -29,83 +37,212 @@ def get_analytics_by_skill(db: Session, class_id: int):
         "writing": {"red": 0, "yellow": 0, "green": 0, "gold": 0},
     }
     
-    for skill_name, status, count in skills_query:
-        result[skill_name.lower()][status.name.lower()] = count
+    for row in summary_rows:
+        result[row.skill_name.lower()] = {"red": row.red, "yellow": row.yellow, "green": row.green, "gold": row.gold}
         
     return result
 
 # --- B. Weighted Student Distribution ---
 def get_weighted_student_distribution(db: Session, class_id: int):
-    students = db.query(Student).options(joinedload(Student.skills)).filter(Student.class_id == class_id).all()
-    distribution = {"red": 0, "yellow": 0, "green": 0, "gold": 0}
+    return get_weighted_distributions_for_classes(db, [class_id])[class_id]
 
-    for student in students:
-        score = _get_student_weighted_score(student)
-        category = _map_score_to_category(score)
-        distribution[category] += 1
-        
-    return distribution
+# --- C. Weighted Distribution for Many Classes ---
+# Reads the precomputed class_weighted_summary rows (see summary_crud)
+def get_weighted_distributions_for_classes(db: Session, class_ids: list[int]):
+    distributions = {class_id: {"red": 0, "yellow": 0, "green": 0, "gold": 0} for class_id in class_ids}
+    if not class_ids:
+        return distributions
+
+    for row in db.query(ClassWeightedSummary).filter(ClassWeightedSummary.class_id.in_(class_ids)).all():
+        distributions[row.class_id] = {"red": row.red, "yellow": row.yellow, "green": row.green, "gold": row.gold}
+
+    return distributions
+
+# Recomputes the weighted distribution from the base tables; per-student averages
+# and buckets are done in SQL, so only the bucket counts leave the database.
+def compute_weighted_distributions(db: Session, class_ids: list[int]):
+    distributions = {class_id: {"red": 0, "yellow": 0, "green": 0, "gold": 0} for class_id in class_ids}
+    if not class_ids:
+        return distributions
+
+    # A student without skills scores 1.0 and so counts as red
+    student_scores = (
+        db.query(Student.class_id.label("class_id"), func.coalesce(func.avg(_status_score_expr()), 1.0).label("score"))
+        .outerjoin(Skill, Skill.student_id == Student.id)
+        .filter(Student.class_id.in_(class_ids))
+        .group_by(Student.id, Student.class_id)
+        .subquery()
+    )
+    category = _category_expr(student_scores.c.score)
+    rows = (
+        db.query(student_scores.c.class_id, category, func.count())
+        .group_by(student_scores.c.class_id, category)
+        .all()
+    )
+
+    for class_id, bucket, count in rows:
+        distributions[class_id][bucket] = count
+
+    return distributions
 
 # --- D. Trend Analytics ---
-def get_skill_trends(db: Session, class_id: int, days: int = 30):
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    milestones = db.query(Milestone).join(Student).filter(Student.class_id == class_id, Milestone.timestamp >= start_date).all()
-    
-    trends = {
-        "listening": {"improvements": 0, "declines": 0},
-        "reading": {"improvements": 0, "declines": 0},
-        "speaking": {"improvements": 0, "declines": 0},
-        "writing": {"improvements": 0, "declines": 0},
-    }
+TREND_BUCKETS = ("day", "week", "month")
 
-    for milestone in milestones:
-        if milestone.previous_status is None: continue
-        
-        prev_score = SCORE_MAP.get(milestone.previous_status, 0)
-        new_score = SCORE_MAP.get(milestone.new_status, 0)
-        
-        if new_score > prev_score:
-            trends[milestone.skill_name.lower()]["improvements"] += 1
-        elif new_score < prev_score:
-            trends[milestone.skill_name.lower()]["declines"] += 1
-            
-    return trends
+def _empty_trends():
+    return {"listening": {"improvements": 0, "declines": 0}, "reading": {"improvements": 0, "declines": 0},
+            "speaking": {"improvements": 0, "declines": 0}, "writing": {"improvements": 0, "declines": 0}}
+
+def _trend_sign_exprs():
+    # 1/0 flags per milestone; summed, they are the improvement and decline counts
+    # An unknown status scores 0, as with SCORE_MAP.get(status, 0)
+    previous_score = func.coalesce(_status_score_expr(Milestone.previous_status), 0)
+    new_score = func.coalesce(_status_score_expr(Milestone.new_status), 0)
+    return (
+        case((new_score > previous_score, 1), else_=0),
+        case((new_score < previous_score, 1), else_=0),
+    )
+
+def _bucket_expr(db: Session, bucket: str):
+    # First day of the milestone's day/week/month, in the database's own date functions.
+    # Weeks start on Monday.
+    timestamp = Milestone.timestamp
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        if bucket == "week":
+            return func.date(timestamp, "-6 days", "weekday 1")
+        return func.strftime("%Y-%m-01" if bucket == "month" else "%Y-%m-%d", timestamp)
+    if dialect in ("mysql", "mariadb"):
+        if bucket == "week":
+            return func.subdate(func.date(timestamp), func.weekday(timestamp))
+        if bucket == "month":
+            return func.date_format(timestamp, "%Y-%m-01")
+        return func.date(timestamp)
+    return cast(func.date_trunc(bucket, timestamp), Date)
+
+def _bucket_start(value: date, bucket: str):
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    return value
+
+def _bucket_range(start: date, end: date, bucket: str):
+    # Every bucket start from start to end, so quiet periods show up as zeros
+    current = _bucket_start(start, bucket)
+    while current <= end:
+        yield current
+        if bucket == "day":
+            current += timedelta(days=1)
+        elif bucket == "week":
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+# Improvements and declines per skill over the last `days` days, counted in SQL.
+# With a bucket ("day", "week" or "month") each skill gets a series instead:
+# [{"start": "2024-05-06", "improvements": X, "declines": Y}, ...], oldest first.
+# Both forms come from one grouped query over the class's milestones in the window.
+def get_skill_trends(db: Session, class_id: int, days: int = 30, bucket: str | None = None):
+    now = datetime.utcnow()
+    start_date = now - timedelta(days=days)
+    improved, declined = _trend_sign_exprs()
+
+    columns = [Milestone.skill_name]
+    if bucket is not None:
+        columns.append(_bucket_expr(db, bucket).label("bucket"))
+    rows = (
+        db.query(*columns, func.sum(improved), func.sum(declined))
+        .join(Student, Student.id == Milestone.student_id)
+        .filter(Student.class_id == class_id, Milestone.timestamp >= start_date, Milestone.previous_status.isnot(None))
+        .group_by(*columns)
+        .all()
+    )
+
+    if bucket is None:
+        trends = _empty_trends()
+        for skill_name, improvements, declines in rows:
+            counts = trends.setdefault(skill_name.lower(), {"improvements": 0, "declines": 0})
+            counts["improvements"] += int(improvements or 0)
+            counts["declines"] += int(declines or 0)
+        return trends
+
+    starts = [start.isoformat() for start in _bucket_range(start_date.date(), now.date(), bucket)]
+    series = {skill: {start: [0, 0] for start in starts} for skill in _empty_trends()}
+    for skill_name, bucket_start, improvements, declines in rows:
+        # Drivers hand back the bucket as a date, datetime or string depending on dialect
+        if isinstance(bucket_start, datetime):
+            bucket_start = bucket_start.date()
+        key = bucket_start.isoformat() if isinstance(bucket_start, date) else str(bucket_start)[:10]
+        counts = series.setdefault(skill_name.lower(), {start: [0, 0] for start in starts}).setdefault(key, [0, 0])
+        counts[0] += int(improvements or 0)
+        counts[1] += int(declines or 0)
+
+    return {
+        skill: [{"start": start, "improvements": counts[0], "declines": counts[1]} for start, counts in sorted(buckets.items())]
+        for skill, buckets in series.items()
+    }
 
 # --- E. Student Comparison / Helper ---
 def get_class_average_scores(db: Session, class_id: int):
-    avg_scores_query = db.query(Skill.name, func.avg(
-        case(
-            (Skill.current_status == SkillStatus.RED, 1),
-            (Skill.current_status == SkillStatus.YELLOW, 2),
-            (Skill.current_status == SkillStatus.GREEN, 3),
-            (Skill.current_status == SkillStatus.GOLD, 4)
-        )
-    )).join(Student).filter(Student.class_id == class_id).group_by(Skill.name).all()
+    avg_scores_query = db.query(Skill.name, func.avg(_status_score_expr())).join(Student).filter(Student.class_id == class_id).group_by(Skill.name).all()
     
     return {name.lower(): avg for name, avg in avg_scores_query}
 
-# --- THIS IS THE RESTORED FUNCTION ---
-def get_student_analytics(db: Session, student_id: int):
-    query = (
-        db.query(Skill.current_status, func.count(Skill.id))
-        .filter(Skill.student_id == student_id)
-        .group_by(Skill.current_status)
+# A student's per-skill scores next to the class averages; None if the student doesn't exist
+def get_student_comparison(db: Session, student_id: int):
+    student = db.query(Student).filter(Student.id == student_id).first()
+    if not student:
+        return None
+
+    class_averages = get_class_average_scores(db, class_id=student.class_id)
+    return [{
+        "skill_name": skill.name,
+        "student_score": SCORE_MAP.get(skill.current_status, 0),
+        "class_average_score": float(class_averages.get(skill.name.lower()) or 0.0)
+    } for skill in student.skills]
+
+# --- F. Class Dashboard ---
+# Everything the class dashboard shows. by-skill and the weighted distribution
+# come from the same summary rows as their standalone endpoints; the
+# comparison is built from one pass over the class's skill rows.
+def get_class_dashboard(db: Session, class_id: int, days: int = 30):
+    rows = (
+        db.query(Student.id, Student.name, Student.is_archived, Skill.name, Skill.current_status)
+        .outerjoin(Skill, Skill.student_id == Student.id)
+        .filter(Student.class_id == class_id)
+        .order_by(Student.id, Skill.id)
         .all()
     )
-    
-    analytics = {status.name: 0 for status in SkillStatus}
-    for status, count in query:
-        analytics[status.name] = count
-        
-    total_skills = sum(analytics.values())
-
-    response = {
-        "red": {"count": analytics["RED"], "percentage": (analytics["RED"] / total_skills * 100) if total_skills > 0 else 0},
-        "yellow": {"count": analytics["YELLOW"], "percentage": (analytics["YELLOW"] / total_skills * 100) if total_skills > 0 else 0},
-        "green": {"count": analytics["GREEN"], "percentage": (analytics["GREEN"] / total_skills * 100) if total_skills > 0 else 0},
-        "gold": {"count": analytics["GOLD"], "percentage": (analytics["GOLD"] / total_skills * 100) if total_skills > 0 else 0},
-        "total": total_skills
+
+    skill_totals = {}  # skill name -> [score sum, skill count]
+    students = {}
+
+    for student_id, student_name, is_archived, skill_name, status in rows:
+        student = students.setdefault(student_id, {"id": student_id, "name": student_name, "is_archived": is_archived, "skills": []})
+        if skill_name is None or status is None:
+            continue
+        score = SCORE_MAP.get(status, 0)
+        totals = skill_totals.setdefault(skill_name.lower(), [0, 0])
+        totals[0] += score
+        totals[1] += 1
+        student["skills"].append((skill_name, score))
+
+    class_averages = {name: total / count for name, (total, count) in skill_totals.items()}
+
+    comparison = [{
+        "student_id": student["id"],
+        "student_name": student["name"],
+        "is_archived": student["is_archived"],
+        "skills": [{
+            "skill_name": skill_name,
+            "student_score": score,
+            "class_average_score": float(class_averages.get(skill_name.lower()) or 0.0)
+        } for skill_name, score in student["skills"]]
+    } for student in students.values()]
+
+    return {
+        "by_skill": get_analytics_by_skill(db, class_id=class_id),
+        "weighted_distribution": get_weighted_student_distribution(db, class_id=class_id),
+        "trends": get_skill_trends(db, class_id=class_id, days=days),
+        "comparison": comparison,
     }
-    
-    return response
\ No newline at end of file
@@ -1,16 +1,37 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_
 from app.models.school_models import Class
 from app.schemas.class_schema import ClassCreate
+from app import response_cache
 
 def get_class(db: Session, class_id: int):
     return db.query(Class).filter(Class.id == class_id).first()
 
+def get_classes_by_ids(db: Session, class_ids):
+    return db.query(Class).filter(Class.id.in_(class_ids)).all()
+
+# Offset page in the same (name, id) order as get_classes_page, so clients
+# mixing the two styles neither repeat nor miss classes
 def get_classes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Class).offset(skip).limit(limit).all()
+    return db.query(Class).order_by(Class.name, Class.id).offset(skip).limit(limit).all()
+
+# Keyset page ordered by (name, id), starting after `after`; served by the
+# unique name index. Returns the page and the key of its last row when more follow.
+def get_classes_page(db: Session, after: tuple[str, int] | None = None, limit: int = 100):
+    # An empty page would hand back the wrong row as its cursor
+    limit = max(limit, 1)
+    query = db.query(Class)
+    if after is not None:
+        name, class_id = after
+        query = query.filter(or_(Class.name > name, and_(Class.name == name, Class.id > class_id)))
+    rows = query.order_by(Class.name, Class.id).limit(limit + 1).all()
+    next_key = [rows[limit - 1].name, rows[limit - 1].id] if len(rows) > limit else None
+    return rows[:limit], next_key
 
 def create_class(db: Session, class_obj: ClassCreate):
     db_class = Class(name=class_obj.name)
     db.add(db_class)
     db.commit()
+    response_cache.bump_classes()
     db.refresh(db_class)
     return db_class
\ No newline at end of file
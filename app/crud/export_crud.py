@@ -1,8 +1,14 @@
-from sqlalchemy.orm import Session
-from . import student_crud, class_crud, analytics_crud
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func
+from . import class_crud
+from app.models.school_models import Student, Skill, Milestone, SkillStatus
+from app import pdf_pool
 
 import io
+import xlsxwriter
+from concurrent.futures import as_completed
 from datetime import datetime
+from functools import lru_cache
 
 # ReportLab Imports
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -14,47 +20,133 @@ from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 
 
+# --- Data Versions for the Export Cache ---
+# Any write that can change an export moves at least one of these values:
+# skill updates bump last_updated and add a milestone, promotions change the
+# student set, and new students add skill rows.
+
+def _version_string(*values):
+    return ":".join("" if value is None else str(value) for value in values)
+
+def get_class_data_version(db: Session, class_id: int):
+    students = db.query(func.count(Student.id), func.sum(Student.id)).filter(Student.class_id == class_id).one()
+    skills = db.query(func.count(Skill.id), func.max(Skill.last_updated)).join(Student).filter(Student.class_id == class_id).one()
+    milestones = db.query(func.count(Milestone.id), func.max(Milestone.timestamp)).join(Student).filter(Student.class_id == class_id).one()
+    return _version_string(*students, *skills, *milestones)
+
+def get_student_data_version(db: Session, student: Student):
+    skills = db.query(func.count(Skill.id), func.max(Skill.last_updated)).filter(Skill.student_id == student.id).one()
+    milestones = db.query(func.count(Milestone.id), func.max(Milestone.timestamp)).filter(Milestone.student_id == student.id).one()
+    return _version_string(student.class_id, *skills, *milestones)
+
 # --- CSV and XLSX Generation (Refactored to remove Pandas) ---
 
-def generate_class_report_data(db: Session, class_id: int):
-    db_class = class_crud.get_class(db, class_id=class_id)
-    if not db_class:
-        return None
+REPORT_COLUMNS = ["Student Name", "Listening", "Reading", "Speaking", "Writing"]
 
-    ordered_columns = ["Student Name", "Listening", "Reading", "Speaking", "Writing"]
-    data = []
-    
-    for student in db_class.students:
-        student_data = {"Student Name": student.name}
-        # Get skill status values
-        skills_map = {skill.name: skill.current_status.value for skill in student.skills}
-        
-        # Ensure all columns exist (default to empty string if missing)
-        row = {}
-        row["Student Name"] = student.name
-        for col in ordered_columns[1:]: # Skip Student Name
-            row[col] = skills_map.get(col, "")
-            
-        data.append(row)
+# Yields one report row per student as the database returns them. A single
+# student/skill join is streamed in batches, so memory stays flat for any class size.
+def iter_class_report_rows(db: Session, class_id: int, batch_size: int = 500):
+    rows = (
+        db.query(Student.id, Student.name, Skill.name, Skill.current_status)
+        .outerjoin(Skill, Skill.student_id == Student.id)
+        .filter(Student.class_id == class_id)
+        .order_by(Student.id)
+        .execution_options(stream_results=True)
+        .yield_per(batch_size)
+    )
 
-    return data, ordered_columns
+    current_id, current_row = None, None
+    for student_id, student_name, skill_name, status in rows:
+        if student_id != current_id:
+            if current_row is not None:
+                yield current_row
+            current_id = student_id
+            current_row = {column: "" for column in REPORT_COLUMNS}
+            current_row["Student Name"] = student_name
+        if skill_name in current_row and status is not None:
+            current_row[skill_name] = status.value
+    if current_row is not None:
+        yield current_row
 
-# --- NEW Professional PDF Generation using reportlab ---
+# Conditional formats for the status columns, matching the PDF chart colours
+XLSX_STATUS_FORMATS = {
+    "Red": {"bg_color": "#F8D7DA", "font_color": "#842029"},
+    "Yellow": {"bg_color": "#FFF3CD", "font_color": "#664D03"},
+    "Green": {"bg_color": "#D1E7DD", "font_color": "#0F5132"},
+    "Gold": {"bg_color": "#FFE8A1", "font_color": "#7A5A00"},
+}
 
-def generate_student_pdf_report(db: Session, student_id: int):
-    student = student_crud.get_student_by_id(db, student_id=student_id)
-    if not student:
-        return None
+# Writes the class report into `output` (a path or binary file object) using
+# XlsxWriter's constant_memory mode: rows are flushed to disk as they are
+# written, so memory stays flat no matter how many students the class has.
+def write_class_report_xlsx(db: Session, class_id: int, output):
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    worksheet = workbook.add_worksheet("Students")
+    header_format = workbook.add_format({"bold": True, "bottom": 1})
 
-    analytics = analytics_crud.get_student_analytics(db, student_id=student_id)
+    worksheet.set_column(0, 0, 32)
+    worksheet.set_column(1, len(REPORT_COLUMNS) - 1, 12)
+    worksheet.freeze_panes(1, 0)
+    worksheet.write_row(0, 0, REPORT_COLUMNS, header_format)
 
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, rightMargin=0.75*inch, leftMargin=0.75*inch, topMargin=1*inch, bottomMargin=0.75*inch)
-    
+    row_num = 0
+    for row_num, row in enumerate(iter_class_report_rows(db, class_id), start=1):
+        worksheet.write_row(row_num, 0, [row[column] for column in REPORT_COLUMNS])
+
+    # One rule per status over the whole status block instead of a format per cell
+    if row_num:
+        for status, style in XLSX_STATUS_FORMATS.items():
+            worksheet.conditional_format(1, 1, row_num, len(REPORT_COLUMNS) - 1, {
+                "type": "cell",
+                "criteria": "==",
+                "value": f'"{status}"',
+                "format": workbook.add_format(style),
+            })
+
+    workbook.close()
+    return row_num
+
+# --- NEW Professional PDF Generation using reportlab ---
+
+# Built once per process; the stylesheet is only read while rendering
+@lru_cache(maxsize=1)
+def _report_styles():
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(name='ReportTitle', parent=styles['h1'], alignment=TA_CENTER, fontSize=18))
     styles.add(ParagraphStyle(name='SectionTitle', parent=styles['h2'], fontSize=14, spaceBefore=20, spaceAfter=10))
     styles.add(ParagraphStyle(name='SmallGrey', parent=styles['Normal'], textColor=colors.dimgrey))
+    return styles
+
+# Plain, picklable snapshot of everything the PDF needs, so reports can be
+# rendered in worker processes without a database session.
+def student_report_data(student: Student):
+    status_counts = {status.name.lower(): 0 for status in SkillStatus}
+    for skill in student.skills:
+        if skill.current_status is not None:
+            status_counts[skill.current_status.name.lower()] += 1
+
+    return {
+        "id": student.id,
+        "name": student.name,
+        "class_name": student.enrolled_class.name,
+        "enrollment_date": student.enrollment_date,
+        "status_counts": status_counts,
+        "milestones": [{
+            "timestamp": m.timestamp,
+            "skill_name": m.skill_name,
+            "previous_status": m.previous_status.value if m.previous_status else None,
+            "new_status": m.new_status.value,
+            "narrative": m.narrative,
+            "comment": m.comment,
+        } for m in student.milestones],  # already newest first (relationship order_by)
+    }
+
+def render_student_pdf(report: dict):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, rightMargin=0.75*inch, leftMargin=0.75*inch, topMargin=1*inch, bottomMargin=0.75*inch)
+    
+    styles = _report_styles()
+    analytics = report['status_counts']
 
     story = []
 
@@ -65,9 +157,9 @@ def generate_student_pdf_report(db: Session, student_id: int):
 
     # --- Student Info ---
     info_data = [
-        [Paragraph("<b>Student:</b>", styles['Normal']), Paragraph(student.name, styles['Normal'])],
-        [Paragraph("<b>Class:</b>", styles['Normal']), Paragraph(student.enrolled_class.name, styles['Normal'])],
-        [Paragraph("<b>Enrollment Date:</b>", styles['Normal']), Paragraph(student.enrollment_date.strftime('%Y-%m-%d'), styles['Normal'])],
+        [Paragraph("<b>Student:</b>", styles['Normal']), Paragraph(report['name'], styles['Normal'])],
+        [Paragraph("<b>Class:</b>", styles['Normal']), Paragraph(report['class_name'], styles['Normal'])],
+        [Paragraph("<b>Enrollment Date:</b>", styles['Normal']), Paragraph(report['enrollment_date'].strftime('%Y-%m-%d'), styles['Normal'])],
     ]
     info_table = Table(info_data, colWidths=[1.5*inch, None])
     info_table.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
@@ -80,10 +172,10 @@ def generate_student_pdf_report(db: Session, student_id: int):
     # Create Bar Chart
     drawing = Drawing(400, 200)
     chart_data = [(
-        analytics['red']['count'],
-        analytics['yellow']['count'],
-        analytics['green']['count'],
-        analytics['gold']['count'],
+        analytics['red'],
+        analytics['yellow'],
+        analytics['green'],
+        analytics['gold'],
     )]
     bc = VerticalBarChart()
     bc.x = 50
@@ -110,23 +202,22 @@ def generate_student_pdf_report(db: Session, student_id: int):
     # --- Progress Timeline Section ---
     story.append(Paragraph("Progress Timeline (Most Recent First)", styles['SectionTitle']))
     
-    if student.milestones:
-        sorted_milestones = sorted(student.milestones, key=lambda m: m.timestamp, reverse=True)
-        
+    if report['milestones']:
+
         timeline_data = [
             [Paragraph("<b>Date</b>", styles['Normal']), Paragraph("<b>Skill</b>", styles['Normal']), Paragraph("<b>Change</b>", styles['Normal']), Paragraph("<b>Notes & Narrative</b>", styles['Normal'])]
         ]
         
-        for milestone in sorted_milestones:
-            date_str = milestone.timestamp.strftime('%Y-%m-%d %H:%M')
-            skill_str = milestone.skill_name
-            change_str = f"{milestone.previous_status.value if milestone.previous_status else 'None'} → {milestone.new_status.value}"
+        for milestone in report['milestones']:
+            date_str = milestone['timestamp'].strftime('%Y-%m-%d %H:%M')
+            skill_str = milestone['skill_name']
+            change_str = f"{milestone['previous_status'] or 'None'} → {milestone['new_status']}"
             
             notes = []
-            if milestone.narrative:
-                notes.append(Paragraph(f"<i>{milestone.narrative}</i>", styles['Italic']))
-            if milestone.comment:
-                notes.append(Paragraph(f"<b>Teacher:</b> {milestone.comment}", styles['Normal']))
+            if milestone['narrative']:
+                notes.append(Paragraph(f"<i>{milestone['narrative']}</i>", styles['Italic']))
+            if milestone['comment']:
+                notes.append(Paragraph(f"<b>Teacher:</b> {milestone['comment']}", styles['Normal']))
             
             timeline_data.append([date_str, skill_str, change_str, notes])
 
@@ -144,5 +235,39 @@ def generate_student_pdf_report(db: Session, student_id: int):
 
     doc.build(story)
     
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer.getvalue()
+
+# --- Bulk Class PDF Export ---
+
+# Students, skills and milestones for the whole class in three batched queries
+def get_class_pdf_report_data(db: Session, class_id: int):
+    db_class = class_crud.get_class(db, class_id=class_id)
+    if not db_class:
+        return None
+
+    students = (
+        db.query(Student)
+        .options(selectinload(Student.skills), selectinload(Student.milestones))
+        .filter(Student.class_id == class_id)
+        .order_by(Student.id)
+        .all()
+    )
+    return [student_report_data(student) for student in students]
+
+def _render_named_student_pdf(report: dict):
+    safe_name = "".join(ch if ch.isalnum() else "_" for ch in report['name']).strip("_") or "student"
+    return f"student_{report['id']}_{safe_name}.pdf", render_student_pdf(report)
+
+# Renders the reports on the shared PDF pool and yields (filename, pdf bytes)
+# in completion order, so the caller can stream each one as soon as it is ready.
+def iter_rendered_student_pdfs(reports: list[dict]):
+    if not reports:
+        return
+    futures = [pdf_pool.get_pool().submit(_render_named_student_pdf, report) for report in reports]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # A client that disconnects mid-download must not keep the pool busy
+        for future in futures:
+            future.cancel()
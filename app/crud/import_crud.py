@@ -0,0 +1,151 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.school_models import Class
+from . import student_crud
+from app import response_cache
+
+import io
+import csv
+import codecs
+import zipfile
+from itertools import islice
+
+# --- Roster Import from CSV / XLSX ---
+# Uploads need a student name column and a class column (headers below,
+# case-insensitive). Anything else is ignored, so the class report export,
+# which has no class column, imports once one is added.
+
+STUDENT_NAME_HEADERS = ("student name", "name", "student")
+CLASS_NAME_HEADERS = ("class", "class name")
+MAX_NAME_LENGTH = 255
+IMPORT_CHUNK_SIZE = 500
+
+def _find_column(header: list, candidates: tuple):
+    normalized = [str(cell).strip().lower() if cell is not None else "" for cell in header]
+    for candidate in candidates:
+        if candidate in normalized:
+            return normalized.index(candidate)
+    return None
+
+# Raised for an upload that cannot be read as the format it claims to be
+class InvalidUpload(ValueError):
+    pass
+
+def _check_utf8(stream, chunk_size: int = 64 * 1024):
+    # A first pass over the upload so a bad byte near the end is reported
+    # before any chunk has been imported. It decodes incrementally and keeps
+    # one chunk at a time; Werkzeug spools large uploads to disk, so the
+    # second read is from the spool file, not a copy in memory.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    offset = 0
+    try:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            decoder.decode(chunk)
+            offset += len(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise InvalidUpload(
+            f"CSV file is not UTF-8 encoded (invalid byte at offset {offset + e.start}); save it as 'CSV UTF-8' and upload again"
+        ) from e
+    stream.seek(0)
+
+def _iter_workbook_rows(workbook):
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+# Returns an iterator over the rows of an uploaded roster, header first.
+# Raises InvalidUpload if the file is not valid UTF-8 CSV or a readable XLSX.
+def iter_upload_rows(stream, filename: str):
+    if filename.lower().endswith(".xlsx"):
+        # Imported lazily: only XLSX uploads need openpyxl
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        try:
+            workbook = load_workbook(stream, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, InvalidFileException, KeyError, ValueError, OSError) as e:
+            raise InvalidUpload("File is not a readable .xlsx workbook") from e
+        if not workbook.worksheets:
+            workbook.close()
+            raise InvalidUpload("Workbook has no worksheets")
+        return _iter_workbook_rows(workbook)
+
+    _check_utf8(stream)
+    return csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+
+def _cell(row: list, index: int):
+    if index >= len(row) or row[index] is None:
+        return ""
+    return str(row[index]).strip()
+
+# Fills `class_ids` for the given names, creating missing classes; returns how many were created
+def _resolve_class_ids(db: Session, names: set, class_ids: dict):
+    missing = [name for name in names if name not in class_ids]
+    if not missing:
+        return 0
+    for class_id, name in db.query(Class.id, Class.name).filter(Class.name.in_(missing)):
+        class_ids[name] = class_id
+
+    new_classes = [Class(name=name) for name in missing if name not in class_ids]
+    if new_classes:
+        db.add_all(new_classes)
+        db.flush()
+        for db_class in new_classes:
+            class_ids[db_class.name] = db_class.id
+    return len(new_classes)
+
+# Imports the rows chunk by chunk. Each chunk is its own transaction: a
+# database failure rolls back and reports only that chunk's rows.
+def import_roster(db: Session, rows, chunk_size: int = IMPORT_CHUNK_SIZE):
+    report = {"created_students": 0, "created_classes": 0, "errors": []}
+
+    header = next(rows, None)
+    if header is None:
+        report["errors"].append({"row": 1, "detail": "File is empty"})
+        return report
+    name_column = _find_column(header, STUDENT_NAME_HEADERS)
+    class_column = _find_column(header, CLASS_NAME_HEADERS)
+    if name_column is None or class_column is None:
+        report["errors"].append({"row": 1, "detail": "Header must include 'Student Name' and 'Class' columns"})
+        return report
+
+    class_ids = {}
+    numbered_rows = enumerate(rows, start=2)
+    while True:
+        chunk = list(islice(numbered_rows, chunk_size))
+        if not chunk:
+            break
+
+        valid = []
+        for row_num, row in chunk:
+            if not any(_cell(row, i) for i in range(len(row))):
+                continue
+            student_name, class_name = _cell(row, name_column), _cell(row, class_column)
+            if not student_name or not class_name:
+                report["errors"].append({"row": row_num, "detail": "Student name and class are required"})
+            elif len(student_name) > MAX_NAME_LENGTH or len(class_name) > MAX_NAME_LENGTH:
+                report["errors"].append({"row": row_num, "detail": f"Names are limited to {MAX_NAME_LENGTH} characters"})
+            else:
+                valid.append((row_num, student_name, class_name))
+        if not valid:
+            continue
+
+        known_class_ids = dict(class_ids)
+        try:
+            created_classes = _resolve_class_ids(db, {class_name for _, _, class_name in valid}, class_ids)
+            created_students = student_crud.bulk_create_students(db, [(student_name, class_ids[class_name]) for _, student_name, class_name in valid])
+            db.commit()
+            response_cache.bump_classes(*(class_ids[class_name] for _, _, class_name in valid))
+            report["created_classes"] += created_classes
+            report["created_students"] += created_students
+        except SQLAlchemyError as e:
+            db.rollback()
+            # Classes created in the failed chunk were rolled back too
+            class_ids = known_class_ids
+            detail = f"Database error: {e.__class__.__name__}"
+            report["errors"].extend({"row": row_num, "detail": detail} for row_num, _, _ in valid)
+
+    return report
@@ -1,6 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import insert
 from app.models.school_models import Skill, Milestone, Student, SkillStatus
-from app.schemas.skill_schema import SkillUpdate
+from app.schemas.skill_schema import SkillUpdate, SkillBatchItem
+from app.crud import summary_crud
+from app import response_cache
 
 def _generate_narrative(student_name: str, skill_name: str, new_status: SkillStatus, progress_value: str | None):
     templates = {
@@ -16,11 +19,9 @@ def _generate_narrative(student_name: str, skill_name: str, new_status: SkillSta
         
     return narrative
 
-def update_student_skill(db: Session, student_id: int, skill_name: str, update_data: SkillUpdate):
-    skill = db.query(Skill).join(Student).filter(Skill.student_id == student_id, Skill.name == skill_name).first()
-    if not skill:
-        return None
-
+# Applies `update_data` to a loaded skill and returns the column values of the
+# Milestone that records it; shared by the single and batch update paths.
+def _apply_skill_update(skill: Skill, student: Student, update_data: SkillUpdate):
     previous_status = skill.current_status
     
     # Update Status if provided
@@ -35,8 +36,8 @@ def update_student_skill(db: Session, student_id: int, skill_name: str, update_d
 
     # Generate the automated narrative
     narrative = _generate_narrative(
-        student_name=skill.student.name,
-        skill_name=skill_name,
+        student_name=student.name,
+        skill_name=skill.name,
         new_status=current_status_choice,
         progress_value=update_data.progress_value
     )
@@ -44,23 +45,85 @@ def update_student_skill(db: Session, student_id: int, skill_name: str, update_d
     # Add Class Name to Comment
     final_comment = update_data.comment
     if final_comment:
-        class_name = skill.student.enrolled_class.name if skill.student.enrolled_class else "Unknown Class"
+        class_name = student.enrolled_class.name if student.enrolled_class else "Unknown Class"
         final_comment = f"{final_comment} (Class: {class_name})"
 
     # Only create a milestone if there's a status change, score change, or a comment/progress update
     # For now, let's create it every time an update involves these significant fields to track history
-    milestone = Milestone(
-        student_id=student_id,
-        skill_name=skill_name,
-        previous_status=previous_status,
-        new_status=current_status_choice,
-        comment=final_comment, # Use the comment with class name
-        progress_value=update_data.progress_value,
-        narrative=narrative # Save the narrative to the database
-    )
+    return {
+        "student_id": student.id,
+        "skill_name": skill.name,
+        "previous_status": previous_status,
+        "new_status": current_status_choice,
+        "comment": final_comment, # Use the comment with class name
+        "progress_value": update_data.progress_value,
+        "narrative": narrative # Save the narrative to the database
+    }
+
+def update_student_skill(db: Session, student_id: int, skill_name: str, update_data: SkillUpdate):
+    skill = db.query(Skill).join(Student).filter(Skill.student_id == student_id, Skill.name == skill_name).first()
+    if not skill:
+        return None
+
+    summary_before = summary_crud.student_snapshot(skill.student)
+    milestone = Milestone(**_apply_skill_update(skill, skill.student, update_data))
     db.add(milestone)
+
+    # Keep the class analytics summary in the same transaction
+    summary_crud.record_change(db, summary_before, summary_crud.student_snapshot(skill.student))
+    class_id = skill.student.class_id
     
     db.commit()
+    response_cache.bump_classes(class_id)
     db.refresh(skill)
     
-    return skill
\ No newline at end of file
+    return skill
+
+# Applies many updates in one transaction. Targets are loaded with two
+# queries (students + their skills), milestones go in as one executemany
+# INSERT, and the result list has one entry per input item: the updated
+# Skill, or None when the student/skill pair does not exist.
+def update_student_skills_batch(db: Session, updates: list[SkillBatchItem]):
+    student_ids = {item.student_id for item in updates}
+    students = (
+        db.query(Student)
+        .options(selectinload(Student.skills), joinedload(Student.enrolled_class))
+        .filter(Student.id.in_(student_ids))
+        .all()
+    )
+    students_by_id = {student.id: student for student in students}
+    skills_by_key = {(skill.student_id, skill.name): skill for student in students for skill in student.skills}
+
+    summary_before = {student.id: summary_crud.student_snapshot(student) for student in students}
+    touched_students = {}
+    milestones = []
+    results = []
+
+    try:
+        for item in updates:
+            skill = skills_by_key.get((item.student_id, item.skill_name))
+            if skill is None:
+                results.append(None)
+                continue
+            student = students_by_id[item.student_id]
+            milestones.append(_apply_skill_update(skill, student, item))
+            touched_students[student.id] = student
+            results.append(skill)
+
+        if milestones:
+            db.execute(insert(Milestone), milestones)
+        for student in touched_students.values():
+            summary_crud.record_change(db, summary_before[student.id], summary_crud.student_snapshot(student))
+        touched_class_ids = {student.class_id for student in touched_students.values()}
+        db.commit()
+        response_cache.bump_classes(*touched_class_ids)
+    except Exception:
+        db.rollback()
+        raise
+
+    # Reload the committed skills (server-side last_updated) in one query
+    updated_ids = [skill.id for skill in results if skill is not None]
+    if updated_ids:
+        db.query(Skill).filter(Skill.id.in_(updated_ids)).all()
+
+    return results
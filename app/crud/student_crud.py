@@ -1,20 +1,133 @@
-from sqlalchemy.orm import Session
-from app.models.school_models import Student, Skill, SkillStatus # Import SkillStatus
+from sqlalchemy.orm import Session, selectinload, joinedload, load_only, aliased
+from sqlalchemy import func, insert, update, select, case, literal, or_, and_, String
+from datetime import datetime
+from app.models.school_models import Class, Student, Skill, Milestone, SkillStatus # Import SkillStatus
 from app.schemas.student_schema import StudentCreate
+from app.crud import summary_crud
+from app import response_cache
+from app.pagination import InvalidCursor
 
-def get_student_by_id(db: Session, student_id: int):
-    return db.query(Student).filter(Student.id == student_id).first()
+def get_student_by_id(db: Session, student_id: int, options: list = ()):
+    return db.query(Student).options(*options).filter(Student.id == student_id).first()
 
-def get_students_by_class_id(db: Session, class_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False):
-    query = db.query(Student).filter(Student.class_id == class_id)
+# Scalar Student columns a response may select (id is always loaded)
+STUDENT_FIELDS = ("name", "enrollment_date", "is_archived")
+
+# Loader options for a partial Student: `fields` limits the selected columns
+# (None loads all of them) and each relationship is batch-loaded only if asked for.
+def student_load_options(fields: list[str] | None = None, skills: bool = True, milestones: bool = False, enrolled_class: bool = False):
+    options = []
+    if fields is not None:
+        columns = [getattr(Student, field) for field in fields]
+        if enrolled_class:
+            columns.append(Student.class_id)
+        options.append(load_only(Student.id, *columns))
+    if skills:
+        options.append(selectinload(Student.skills))
+    if milestones:
+        options.append(selectinload(Student.milestones))
+    if enrolled_class:
+        options.append(joinedload(Student.enrolled_class))
+    return options
+
+def get_student_class_id(db: Session, student_id: int):
+    return db.query(Student.class_id).filter(Student.id == student_id).scalar()
+
+# With `after_id` the page starts after that student (keyset pagination on
+# id, served by the class_id / class_id+is_archived indexes) instead of at `skip`.
+def get_students_by_class_id(db: Session, class_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False, load_milestones: bool = True, after_id: int | None = None,
+                             load_skills: bool = True, fields: list[str] | None = None):
+    # Skills and milestones are batch-loaded with one IN query each (when
+    # requested), so serializing a roster costs a constant number of queries
+    options = student_load_options(fields, skills=load_skills, milestones=load_milestones)
+    query = db.query(Student).options(*options).filter(Student.class_id == class_id)
     if not include_archived:
         query = query.filter(Student.is_archived == False)
-    return query.offset(skip).limit(limit).all()
+    if after_id is not None:
+        query = query.filter(Student.id > after_id)
+    return query.order_by(Student.id).offset(skip).limit(limit).all()
+
+# One page of a student's milestone history, newest first. `before` is the
+# (timestamp, id) of the last milestone already seen; `since` is inclusive,
+# `until` exclusive. Served by ix_milestones_student_id_timestamp. Returns
+# the page and the key of its last row when more follow.
+# SQLite stores server-default timestamps as "YYYY-MM-DD HH:MM:SS" text but binds
+# datetimes with ".000000" appended, so a bound on a whole second would sort after
+# the rows stamped with it. The shortest ISO text compares right against both forms.
+def _timestamp_bound(db: Session, value: datetime):
+    if db.get_bind().dialect.name == "sqlite":
+        return literal(value.isoformat(" "), String)
+    return value
+
+# One page of a student's milestones, newest first. `before` is the id of the last
+# milestone on the previous page; the page continues after that row's own
+# (timestamp, id), read back from the table so it compares like for like.
+# Raises InvalidCursor if `before` is not one of this student's milestones.
+def get_student_milestones(db: Session, student_id: int, since: datetime | None = None, until: datetime | None = None,
+                           skill_name: str | None = None, before: int | None = None, limit: int = 50):
+    query = db.query(Milestone).filter(Milestone.student_id == student_id)
+    if since is not None:
+        query = query.filter(Milestone.timestamp >= _timestamp_bound(db, since))
+    if until is not None:
+        query = query.filter(Milestone.timestamp < _timestamp_bound(db, until))
+    if skill_name is not None:
+        query = query.filter(Milestone.skill_name == skill_name)
+    if before is not None:
+        if db.query(Milestone.id).filter(Milestone.id == before, Milestone.student_id == student_id).first() is None:
+            raise InvalidCursor("Invalid cursor")
+        anchor = aliased(Milestone)
+        anchor_timestamp = select(anchor.timestamp).where(anchor.id == before, anchor.student_id == student_id).scalar_subquery()
+        query = query.filter(or_(Milestone.timestamp < anchor_timestamp, and_(Milestone.timestamp == anchor_timestamp, Milestone.id < before)))
+
+    rows = query.order_by(Milestone.timestamp.desc(), Milestone.id.desc()).limit(limit + 1).all()
+    next_key = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_key
+
+# Most recent `per_student` milestones for each student, in one windowed query
+def get_recent_milestones_by_student(db: Session, student_ids: list[int], per_student: int):
+    milestones = {student_id: [] for student_id in student_ids}
+    if not student_ids or per_student <= 0:
+        return milestones
+
+    ranked = (
+        db.query(
+            Milestone.id.label("id"),
+            func.row_number().over(
+                partition_by=Milestone.student_id,
+                order_by=(Milestone.timestamp.desc(), Milestone.id.desc())
+            ).label("position")
+        )
+        .filter(Milestone.student_id.in_(student_ids))
+        .subquery()
+    )
+    rows = (
+        db.query(Milestone)
+        .join(ranked, ranked.c.id == Milestone.id)
+        .filter(ranked.c.position <= per_student)
+        .order_by(Milestone.student_id, ranked.c.position)
+        .all()
+    )
+    for milestone in rows:
+        milestones[milestone.student_id].append(milestone)
+    return milestones
+
+# Maps each class id to its student ids using a single query
+def get_student_ids_by_class_ids(db: Session, class_ids: list[int]):
+    student_ids = {class_id: [] for class_id in class_ids}
+    if not class_ids:
+        return student_ids
+    rows = db.query(Student.class_id, Student.id).filter(Student.class_id.in_(class_ids)).order_by(Student.id).all()
+    for class_id, student_id in rows:
+        student_ids[class_id].append(student_id)
+    return student_ids
 
 def promote_student(db: Session, student_id: int, new_class_id: int):
     db_student = get_student_by_id(db, student_id=student_id)
     if not db_student:
         return None
+
+    summary_before = summary_crud.student_snapshot(db_student)
+    old_class_id = db_student.class_id
     
     # 1. Update the student's class
     db_student.class_id = new_class_id
@@ -25,22 +138,151 @@ def promote_student(db: Session, student_id: int, new_class_id: int):
         skill.current_status = SkillStatus.RED
     # --- END OF NEW LOGIC ---
 
+    # Moves the student's contribution from the old class summary to the new one
+    summary_crud.record_change(db, summary_before, summary_crud.student_snapshot(db_student))
+
     db.commit()
+    response_cache.bump_classes(old_class_id, new_class_id)
     db.refresh(db_student)
     return db_student
 
+DEFAULT_SKILL_NAMES = ["Listening", "Reading", "Speaking", "Writing"]
+
+# A new, unsaved student with the default skill set
+def new_student(name: str, class_id: int):
+    return Student(
+        name=name,
+        class_id=class_id,
+        skills=[Skill(name=skill_name, current_status=SkillStatus.RED) for skill_name in DEFAULT_SKILL_NAMES]
+    )
+
+# Inserts many new students (each a (name, class_id) pair) plus their default
+# skills with executemany statements, inside the caller's transaction.
+def bulk_create_students(db: Session, students: list[tuple[str, int]]):
+    if not students:
+        return 0
+
+    student_rows = [{"name": name, "class_id": class_id} for name, class_id in students]
+    if db.get_bind().dialect.insert_executemany_returning:
+        # Returned rows come back in no guaranteed order, but students with the
+        # same name and class are interchangeable here, so only the ids matter.
+        student_ids = [student_id for (student_id,) in db.execute(insert(Student).returning(Student.id), student_rows)]
+    else:
+        # No RETURNING with executemany (e.g. MySQL): let the ORM collect ids
+        new_students = [Student(**row) for row in student_rows]
+        db.add_all(new_students)
+        db.flush()
+        student_ids = [student.id for student in new_students]
+
+    db.execute(insert(Skill), [
+        {"student_id": student_id, "name": skill_name, "current_status": SkillStatus.RED, "score": 0}
+        for student_id in student_ids
+        for skill_name in DEFAULT_SKILL_NAMES
+    ])
+    summary_crud.record_changes(db, [(None, summary_crud.student_snapshot(new_student(name, class_id))) for name, class_id in students])
+    return len(student_ids)
+
+# Whole-class promotion / year rollover. `mapping` is {source class id: target
+# class id}; chains such as {1: 2, 2: 3} move each class exactly one step
+# because every statement uses the pre-rollover class_id. Runs as three
+# set-based statements (milestones, skill reset, class reassignment) in one
+# transaction; with dry_run only the preview counts are computed.
+def promote_classes(db: Session, mapping: dict[int, int], include_archived: bool = False, dry_run: bool = False):
+    class_names = dict(db.query(Class.id, Class.name).filter(Class.id.in_(set(mapping) | set(mapping.values()))).all())
+
+    def student_filter():
+        conditions = [Student.class_id.in_(mapping)]
+        if not include_archived:
+            conditions.append(Student.is_archived == False)
+        return conditions
+
+    counts = dict(
+        db.query(Student.class_id, func.count(Student.id))
+        .filter(*student_filter())
+        .group_by(Student.class_id)
+        .all()
+    )
+    skill_counts = dict(
+        db.query(Student.class_id, func.count(Skill.id))
+        .join(Student)
+        .filter(*student_filter())
+        .group_by(Student.class_id)
+        .all()
+    )
+    moves = [{
+        "from_class_id": source_id,
+        "from_class": class_names[source_id],
+        "to_class_id": target_id,
+        "to_class": class_names[target_id],
+        "students": counts.get(source_id, 0),
+        "skills_reset": skill_counts.get(source_id, 0)
+    } for source_id, target_id in mapping.items()]
+    result = {
+        "dry_run": dry_run,
+        "moves": moves,
+        "students_promoted": sum(move["students"] for move in moves),
+        "milestones_written": sum(move["skills_reset"] for move in moves)
+    }
+    if dry_run or not result["students_promoted"]:
+        return result
+
+    affected_students = select(Student.id).where(*student_filter())
+    target_class_id = case(mapping, value=Student.class_id)
+    rollover_comment = case(
+        {source_id: f"Year rollover: {class_names[source_id]} → {class_names[target_id]}" for source_id, target_id in mapping.items()},
+        value=Student.class_id
+    )
+    rollover_narrative = Student.name + case(
+        {source_id: f" was promoted to {class_names[target_id]}; skills were reset for the new year." for source_id, target_id in mapping.items()},
+        value=Student.class_id
+    )
+
+    try:
+        # 1. One rollover milestone per reset skill, written from the pre-reset state
+        db.execute(
+            insert(Milestone).from_select(
+                ["student_id", "skill_name", "previous_status", "new_status", "comment", "narrative"],
+                select(
+                    Skill.student_id,
+                    Skill.name,
+                    Skill.current_status,
+                    literal(SkillStatus.RED, Milestone.__table__.c.new_status.type),
+                    rollover_comment,
+                    rollover_narrative
+                ).join(Student, Skill.student_id == Student.id).where(*student_filter())
+            )
+        )
+        # 2. Reset every skill of the promoted students
+        db.execute(
+            update(Skill)
+            .where(Skill.student_id.in_(affected_students))
+            .values(current_status=SkillStatus.RED)
+            .execution_options(synchronize_session=False)
+        )
+        # 3. Move the students; the CASE maps each source class to its target
+        db.execute(
+            update(Student)
+            .where(*student_filter())
+            .values(class_id=target_class_id)
+            .execution_options(synchronize_session=False)
+        )
+        summary_crud.refresh_classes(db, set(mapping) | set(mapping.values()))
+        db.commit()
+        response_cache.bump_classes(*mapping, *mapping.values())
+    except Exception:
+        db.rollback()
+        raise
+
+    return result
+
 def create_student_for_class(db: Session, student: StudentCreate, class_id: int):
-    db_student = Student(name=student.name, class_id=class_id)
+    db_student = new_student(student.name, class_id)
     db.add(db_student)
-    db.commit()
-    db.refresh(db_student)
 
-    skill_names = ["Listening", "Reading", "Speaking", "Writing"]
-    for name in skill_names:
-        skill = Skill(name=name, student_id=db_student.id)
-        db.add(skill)
-    
+    # Student, skills and summary counts are committed together
+    summary_crud.record_change(db, None, summary_crud.student_snapshot(db_student))
     db.commit()
+    response_cache.bump_classes(class_id)
     db.refresh(db_student)
     return db_student
 
@@ -49,7 +291,9 @@ def archive_student(db: Session, student_id: int):
     if not db_student:
         return None
     db_student.is_archived = True
+    class_id = db_student.class_id
     db.commit()
+    response_cache.bump_classes(class_id)
     db.refresh(db_student)
     return db_student
 
@@ -58,6 +302,8 @@ def restore_student(db: Session, student_id: int):
     if not db_student:
         return None
     db_student.is_archived = False
+    class_id = db_student.class_id
     db.commit()
+    response_cache.bump_classes(class_id)
     db.refresh(db_student)
     return db_student
\ No newline at end of file
@@ -0,0 +1,157 @@
+from collections import Counter
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from app.models.school_models import Class, Student, Skill, ClassSkillSummary, ClassWeightedSummary
+from app.crud.analytics_crud import SCORE_MAP, _map_score_to_category, compute_weighted_distributions
+
+BUCKETS = ("red", "yellow", "green", "gold")
+
+# --- Student Contributions ---
+# A snapshot is what one student adds to the summary tables:
+# its class, a Counter of (skill name, status column) and its weighted bucket.
+def student_snapshot(student: Student):
+    if student is None or student.class_id is None:
+        return None
+    skills = [skill for skill in student.skills if skill.current_status is not None]
+    statuses = Counter((skill.name, skill.current_status.name.lower()) for skill in skills)
+    score = sum(SCORE_MAP[skill.current_status] for skill in skills) / len(skills) if skills else 1.0
+    return {"class_id": student.class_id, "statuses": statuses, "bucket": _map_score_to_category(score)}
+
+# Adds delta to one column of a summary row, creating the row if needed. The
+# create is an upsert so two transactions adding the first row for the same
+# class/skill both succeed instead of one failing on the unique constraint.
+def _bump(db: Session, model, filters: dict, column: str, delta: int):
+    attr = model.__table__.c[column]
+    values = {**filters, **{bucket: 0 for bucket in BUCKETS}, column: delta}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        db.execute(insert(model).values(**values).on_conflict_do_update(index_elements=list(filters), set_={column: attr + delta}))
+    elif dialect in ("mysql", "mariadb"):
+        db.execute(mysql_insert(model).values(**values).on_duplicate_key_update({column: attr + delta}))
+    else:
+        _bump_portable(db, model, filters, column, delta)
+
+# UPDATE, then INSERT in a savepoint; losing the insert race means the row now
+# exists, so the UPDATE is retried
+def _bump_portable(db: Session, model, filters: dict, column: str, delta: int):
+    attr = getattr(model, column)
+    query = db.query(model).filter(*[getattr(model, key) == value for key, value in filters.items()])
+    if query.update({attr: attr + delta}, synchronize_session=False):
+        return
+    try:
+        with db.begin_nested():
+            row = model(**filters, **{bucket: 0 for bucket in BUCKETS})
+            setattr(row, column, delta)
+            db.add(row)
+    except IntegrityError:
+        query.update({attr: attr + delta}, synchronize_session=False)
+
+# Applies the difference between two snapshots inside the caller's transaction
+def record_change(db: Session, before: dict | None, after: dict | None):
+    record_changes(db, [(before, after)])
+
+# Same as record_change for many students at once; deltas are merged first so
+# each summary row is touched at most once per call.
+def record_changes(db: Session, changes: list[tuple[dict | None, dict | None]]):
+    skill_deltas = Counter()
+    bucket_deltas = Counter()
+    for before, after in changes:
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            for (skill_name, column), count in snapshot["statuses"].items():
+                skill_deltas[(snapshot["class_id"], skill_name, column)] += sign * count
+            bucket_deltas[(snapshot["class_id"], snapshot["bucket"])] += sign
+
+    for (class_id, skill_name, column), delta in skill_deltas.items():
+        if delta:
+            _bump(db, ClassSkillSummary, {"class_id": class_id, "skill_name": skill_name}, column, delta)
+    for (class_id, bucket), delta in bucket_deltas.items():
+        if delta:
+            _bump(db, ClassWeightedSummary, {"class_id": class_id}, bucket, delta)
+
+# --- Rebuild / Verify ---
+def _expected_summary(db: Session, class_ids: list[int] | None = None):
+    if class_ids is None:
+        class_ids = [class_id for (class_id,) in db.query(Class.id).all()]
+
+    skill_rows = {}
+    status_counts = (
+        db.query(Student.class_id, Skill.name, Skill.current_status, func.count(Skill.id))
+        .join(Student)
+        .filter(Student.class_id.in_(class_ids), Skill.current_status.isnot(None))
+        .group_by(Student.class_id, Skill.name, Skill.current_status)
+        .all()
+    )
+    for class_id, skill_name, status, count in status_counts:
+        row = skill_rows.setdefault((class_id, skill_name), {bucket: 0 for bucket in BUCKETS})
+        row[status.name.lower()] = count
+
+    weighted_rows = {
+        class_id: distribution
+        for class_id, distribution in compute_weighted_distributions(db, class_ids).items()
+        if any(distribution.values())
+    }
+    return skill_rows, weighted_rows
+
+def _current_summary(db: Session):
+    skill_rows = {
+        (row.class_id, row.skill_name): {bucket: getattr(row, bucket) for bucket in BUCKETS}
+        for row in db.query(ClassSkillSummary).all()
+    }
+    weighted_rows = {
+        row.class_id: {bucket: getattr(row, bucket) for bucket in BUCKETS}
+        for row in db.query(ClassWeightedSummary).all()
+    }
+    # All-zero rows are left behind when a class empties out; they are equivalent to no row
+    skill_rows = {key: counts for key, counts in skill_rows.items() if any(counts.values())}
+    weighted_rows = {key: counts for key, counts in weighted_rows.items() if any(counts.values())}
+    return skill_rows, weighted_rows
+
+def verify_summary(db: Session):
+    expected_skills, expected_weighted = _expected_summary(db)
+    current_skills, current_weighted = _current_summary(db)
+
+    mismatches = []
+    for key in sorted(set(expected_skills) | set(current_skills), key=str):
+        if expected_skills.get(key) != current_skills.get(key):
+            mismatches.append(f"class {key[0]} skill {key[1]}: expected {expected_skills.get(key)}, found {current_skills.get(key)}")
+    for key in sorted(set(expected_weighted) | set(current_weighted)):
+        if expected_weighted.get(key) != current_weighted.get(key):
+            mismatches.append(f"class {key} weighted: expected {expected_weighted.get(key)}, found {current_weighted.get(key)}")
+    return mismatches
+
+def _replace_summary(db: Session, class_ids: list[int] | None = None):
+    skill_rows, weighted_rows = _expected_summary(db, class_ids)
+
+    skill_delete = db.query(ClassSkillSummary)
+    weighted_delete = db.query(ClassWeightedSummary)
+    if class_ids is not None:
+        skill_delete = skill_delete.filter(ClassSkillSummary.class_id.in_(class_ids))
+        weighted_delete = weighted_delete.filter(ClassWeightedSummary.class_id.in_(class_ids))
+    skill_delete.delete(synchronize_session=False)
+    weighted_delete.delete(synchronize_session=False)
+
+    db.add_all(
+        ClassSkillSummary(class_id=class_id, skill_name=skill_name, **counts)
+        for (class_id, skill_name), counts in skill_rows.items()
+    )
+    db.add_all(ClassWeightedSummary(class_id=class_id, **counts) for class_id, counts in weighted_rows.items())
+    return len(skill_rows), len(weighted_rows)
+
+# Recomputes the summary rows of a few classes inside the caller's
+# transaction; used after set-based writes that bypass record_change.
+def refresh_classes(db: Session, class_ids: list[int]):
+    if class_ids:
+        _replace_summary(db, list(class_ids))
+        db.flush()
+
+def rebuild_summary(db: Session):
+    counts = _replace_summary(db)
+    db.commit()
+    return counts
@@ -2,15 +2,13 @@ from sqlalchemy.orm import Session
 # --- THIS IMPORT IS CORRECTED ---
 from app.models.user_model import User
 from app.schemas.user_schema import UserCreate
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app import passwords
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 def create_user(db: Session, user: UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = passwords.hash_password(user.password)
     db_user = User(email=user.email, hashed_password=hashed_password)
     db.add(db_user)
     db.commit()
@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
+from sqlalchemy.pool import QueuePool
 import os
+import threading
+import time
+import weakref
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,22 +20,143 @@ if not DATABASE_URL:
     # This prevents the NoneType error on startup if .env is missing/unloaded
     DATABASE_URL = "sqlite:///./sql_app.db"
 
-from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
+# --- Pool Configuration (all optional, from the environment) ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or 5)
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or 10)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT") or 30)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE") or -1)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING") == "True"
 
-# ... (Previous code)
+# --- SQLite Tuning ---
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS") or 5000)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE") or 256 * 1024 * 1024)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE") or "WAL"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS") or "NORMAL"
 
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# --- Pool Statistics ---
+_stats_lock = threading.Lock()
+_pool_stats = {
+    "connects": 0,
+    "checkouts": 0,
+    "checkins": 0,
+    "invalidations": 0,
+    "timeouts": 0,
+    "total_wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+}
+
+def _count(name: str, amount=1):
+    with _stats_lock:
+        _pool_stats[name] += amount
+
+class TimedQueuePool(QueuePool):
+    # QueuePool that records how long each checkout waited for a connection
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            _count("timeouts")
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with _stats_lock:
+                _pool_stats["total_wait_seconds"] += waited
+                _pool_stats["max_wait_seconds"] = max(_pool_stats["max_wait_seconds"], waited)
+
+def _is_memory_sqlite(url: str):
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+def _engine_options(url: str):
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    if not _is_memory_sqlite(url):
+        # In-memory SQLite keeps its own single-connection pool
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    finally:
+        cursor.close()
+
+# Preforking servers (gunicorn) copy the parent's pools into each worker;
+# drop the inherited connections without closing the parent's sockets. One
+# fork hook covers every engine; engines that were thrown away (tests,
+# benchmarks) drop out of the weak set instead of piling up hooks.
+_engines = weakref.WeakSet()
+
+def _dispose_engines_after_fork():
+    for app_engine in list(_engines):
+        app_engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+def create_app_engine(url: str):
+    app_engine = create_engine(url, **_engine_options(url))
+
+    if url.startswith("sqlite"):
+        event.listen(app_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(app_engine, "connect", lambda *args: _count("connects"))
+    event.listen(app_engine, "checkout", lambda *args: _count("checkouts"))
+    event.listen(app_engine, "checkin", lambda *args: _count("checkins"))
+    event.listen(app_engine, "invalidate", lambda *args: _count("invalidations"))
+
+    _engines.add(app_engine)
+    return app_engine
+
+engine = create_app_engine(DATABASE_URL)
 
 SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 
+# Optional read replica for analytics/export/list traffic (see app.read_routing).
+# Without DATABASE_READ_URL every read goes to the primary.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+if DATABASE_READ_URL:
+    read_engine = create_app_engine(DATABASE_READ_URL)
+    ReadSessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=read_engine))
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
 Base = declarative_base()
 
+# Snapshot of the pool counters plus the pool's current occupancy
+def get_pool_stats():
+    with _stats_lock:
+        stats = dict(_pool_stats)
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        stats.update(
+            pool_size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    stats["avg_wait_seconds"] = stats["total_wait_seconds"] / stats["checkouts"] if stats["checkouts"] else 0.0
+    return stats
+
+# FastAPI dependency. The session is not the thread-scoped one: FastAPI may
+# set up the dependency and run a sync endpoint on different threadpool
+# threads, and a scoped session would then be shared between requests.
 def get_db():
-    db = SessionLocal()
+    db = SessionLocal.session_factory()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,12 +1,24 @@
 import smtplib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 import os
 import random
 
+from app.database import SessionLocal
+from app.models.email_model import OutboundEmail
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 MAIL_USERNAME = os.getenv("MAIL_USERNAME")
 MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
@@ -16,30 +28,239 @@ MAIL_SERVER = os.getenv("MAIL_SERVER")
 MAIL_STARTTLS = os.getenv("MAIL_STARTTLS") == "True"
 MAIL_SSL_TLS = os.getenv("MAIL_SSL_TLS") == "True"
 
+# Queue / worker tuning
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE") or 50)
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS") or 6)
+MAIL_RETRY_BASE_SECONDS = float(os.getenv("MAIL_RETRY_BASE_SECONDS") or 30)
+MAIL_RETRY_MAX_SECONDS = float(os.getenv("MAIL_RETRY_MAX_SECONDS") or 3600)
+# A claimed message is retried by any worker if not finished within this time
+MAIL_SEND_LEASE_SECONDS = float(os.getenv("MAIL_SEND_LEASE_SECONDS") or 300)
+# How often the worker looks for messages queued by other processes
+MAIL_POLL_SECONDS = float(os.getenv("MAIL_POLL_SECONDS") or 30)
+# The SMTP session is closed after this long without sending
+MAIL_IDLE_SECONDS = float(os.getenv("MAIL_IDLE_SECONDS") or 60)
+
 # In a real app, you'd store this code more persistently (e.g., Redis or DB with expiry)
 verification_codes = {}
 
-def send_verification_email(email: str):
+# --- Queue ---
+# Messages are rows in outbound_emails. Requests only insert a row and wake
+# the background worker; delivery, retries and the SMTP session live there.
+def queue_email(db: Session, recipient: str, subject: str, body: str):
+    now = datetime.utcnow()
+    message = OutboundEmail(recipient=recipient, subject=subject, body=body, status="pending", attempts=0, next_attempt_at=now, created_at=now)
+    db.add(message)
+    db.commit()
+    get_mail_worker().wake()
+    return message
+
+def send_verification_email(db: Session, email: str):
     code = str(random.randint(100000, 999999))
     verification_codes[email] = code
-    
+    queue_email(db, email, "Your Setup Verification Code", f"Your verification code is: {code}")
+    return True
+
+def _build_message(message: OutboundEmail):
     msg = MIMEMultipart()
     msg['From'] = MAIL_FROM
-    msg['To'] = email
-    msg['Subject'] = "Your Setup Verification Code"
-    
-    body = f"Your verification code is: {code}"
-    msg.attach(MIMEText(body, 'html'))
-    
+    msg['To'] = message.recipient
+    msg['Subject'] = message.subject
+    msg.attach(MIMEText(message.body, 'html'))
+    return msg.as_string()
+
+def _retry_delay(attempts: int):
+    return min(MAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), MAIL_RETRY_MAX_SECONDS)
+
+# Takes up to MAIL_BATCH_SIZE due messages. Each row is claimed with its own
+# conditional UPDATE, so concurrent workers never send the same message twice.
+def _claim_batch(db: Session, now: datetime):
+    due = (
+        db.query(OutboundEmail.id)
+        .filter(OutboundEmail.status == "pending", OutboundEmail.next_attempt_at <= now)
+        .order_by(OutboundEmail.next_attempt_at)
+        .limit(MAIL_BATCH_SIZE)
+        .all()
+    )
+    lease_until = now + timedelta(seconds=MAIL_SEND_LEASE_SECONDS)
+    claimed = []
+    for (message_id,) in due:
+        updated = (
+            db.query(OutboundEmail)
+            .filter(OutboundEmail.id == message_id, OutboundEmail.status == "pending", OutboundEmail.next_attempt_at <= now)
+            .update({OutboundEmail.next_attempt_at: lease_until, OutboundEmail.attempts: OutboundEmail.attempts + 1}, synchronize_session=False)
+        )
+        if updated:
+            claimed.append(message_id)
+    db.commit()
+    if not claimed:
+        return []
+    return db.query(OutboundEmail).filter(OutboundEmail.id.in_(claimed)).order_by(OutboundEmail.id).all()
+
+# --- Worker ---
+class MailWorker:
+    def __init__(self):
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._stopping = False
+        self._thread = None
+        self._smtp = None
+        self._last_used = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="mail-worker", daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        self.start()
+        self._wake.set()
+
+    # Finishes the batch already claimed, closes the SMTP session and ends the thread
+    def stop(self, timeout: float | None = None):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                sent = self.drain()
+            except Exception:
+                logger.exception("Mail worker failed to drain the queue")
+                sent = 0
+            if not sent and not self._stopping:
+                self._close_if_idle()
+                self._wake.wait(self._seconds_until_next_due())
+                self._wake.clear()
+        self._close()
+
+    # Sleep until the earliest scheduled retry, but never longer than the poll interval
+    def _seconds_until_next_due(self):
+        timeout = MAIL_POLL_SECONDS if self._smtp is None else min(MAIL_POLL_SECONDS, MAIL_IDLE_SECONDS)
+        db = SessionLocal()
+        try:
+            next_due = db.query(func.min(OutboundEmail.next_attempt_at)).filter(OutboundEmail.status == "pending").scalar()
+        except Exception:
+            logger.exception("Mail worker could not read the queue")
+            return timeout
+        finally:
+            db.close()
+        if next_due is None:
+            return timeout
+        return min(max((next_due - datetime.utcnow()).total_seconds(), 0.0), timeout)
+
+    # Sends every due message, batch by batch; returns how many were processed.
+    # Each outcome is committed as soon as it is known, so a crash or an
+    # expired lease mid-batch only resends the message that was in flight.
+    def drain(self):
+        processed = 0
+        db = SessionLocal()
+        try:
+            while not self._stopping:
+                batch = _claim_batch(db, datetime.utcnow())
+                if not batch:
+                    return processed
+                for message in batch:
+                    self._deliver(message)
+                    db.commit()
+                    processed += 1
+            return processed
+        finally:
+            db.close()
+            SessionLocal.remove()
+
+    def _deliver(self, message: OutboundEmail):
+        try:
+            self._send(message)
+        except smtplib.SMTPRecipientsRefused as e:
+            # Permanent: retrying will not change the answer
+            message.status = "failed"
+            message.last_error = str(e)[:500]
+            logger.warning("Email %s to %s refused: %s", message.id, message.recipient, e)
+        except Exception as e:
+            message.last_error = f"{e.__class__.__name__}: {e}"[:500]
+            if message.attempts >= MAIL_MAX_ATTEMPTS:
+                message.status = "failed"
+                logger.error("Giving up on email %s to %s: %s", message.id, message.recipient, e)
+            else:
+                message.next_attempt_at = datetime.utcnow() + timedelta(seconds=_retry_delay(message.attempts))
+                logger.warning("Email %s to %s failed (attempt %s): %s", message.id, message.recipient, message.attempts, e)
+        else:
+            message.status = "sent"
+            message.sent_at = datetime.utcnow()
+            message.last_error = None
+
+    def _send(self, message: OutboundEmail):
+        text = _build_message(message)
+        try:
+            self._connection().sendmail(MAIL_FROM, message.recipient, text)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The kept-alive session went stale; reconnect once
+            self._close()
+            self._connection().sendmail(MAIL_FROM, message.recipient, text)
+        self._last_used = time.monotonic()
+
+    def _connection(self):
+        if self._smtp is None:
+            if MAIL_SSL_TLS:
+                server = smtplib.SMTP_SSL(MAIL_SERVER, MAIL_PORT)
+            else:
+                server = smtplib.SMTP(MAIL_SERVER, MAIL_PORT)
+                if MAIL_STARTTLS:
+                    server.starttls()
+            if MAIL_USERNAME:
+                server.login(MAIL_USERNAME, MAIL_PASSWORD)
+            self._smtp = server
+        return self._smtp
+
+    def _close_if_idle(self):
+        if self._smtp is not None and time.monotonic() - self._last_used >= MAIL_IDLE_SECONDS:
+            self._close()
+
+    def _close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+_startup_checked_pid = None
+
+# One worker per process; a forked web worker gets its own
+def get_mail_worker():
+    global _worker, _worker_pid
+    with _worker_lock:
+        if _worker is None or _worker_pid != os.getpid():
+            _worker = MailWorker()
+            _worker_pid = os.getpid()
+        return _worker
+
+# Starts this process's worker when mail is already waiting: left pending by
+# a restart, or scheduled for a retry. Otherwise the worker starts with the
+# first queue_email. Runs once per process (see app.main / app.asgi).
+def start_worker_if_pending():
+    global _startup_checked_pid
+    with _worker_lock:
+        if _startup_checked_pid == os.getpid():
+            return
+        _startup_checked_pid = os.getpid()
+
+    # Not the thread-scoped session: this runs ahead of the request's own work
+    db = SessionLocal.session_factory()
     try:
-        server = smtplib.SMTP(MAIL_SERVER, MAIL_PORT)
-        if MAIL_STARTTLS:
-            server.starttls()
-        server.login(MAIL_USERNAME, MAIL_PASSWORD)
-        text = msg.as_string()
-        server.sendmail(MAIL_FROM, email, text)
-        server.quit()
-        return True
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-        return False
\ No newline at end of file
+        pending = db.query(OutboundEmail.id).filter(OutboundEmail.status == "pending").first() is not None
+    except SQLAlchemyError:
+        logger.exception("Could not check the outbound mail queue")
+        return
+    finally:
+        db.close()
+    if pending:
+        get_mail_worker().start()
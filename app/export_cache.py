@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "spreadsheet_export_cache")
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES") or 512 * 1024 * 1024)
+
+# Generated export files are stored under a name derived from what they were
+# built from: "<kind>_<object id>_<sha256 of kind, id and data version>.<ext>".
+# A change to the underlying rows changes the data version and therefore the
+# name, so stale files are never served; they are swept when the newer version
+# is stored or aged out by the size-bounded LRU eviction below.
+
+_lock = threading.Lock()
+
+def artifact_key(kind: str, object_id: int, version: str):
+    return hashlib.sha256(f"{kind}:{object_id}:{version}".encode("utf-8")).hexdigest()
+
+def _prefix(kind: str, object_id: int):
+    return f"{kind}_{object_id}_"
+
+def artifact_path(kind: str, object_id: int, key: str, extension: str):
+    return os.path.join(EXPORT_CACHE_DIR, f"{_prefix(kind, object_id)}{key}.{extension}")
+
+# Returns the cached file's path (marking it as recently used) or None
+def get_artifact(kind: str, object_id: int, key: str, extension: str):
+    path = artifact_path(kind, object_id, key, extension)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+# Opens a temp file inside the cache directory for a new artifact; pass it to
+# store_artifact once it is complete, or discard_artifact on failure.
+def open_artifact_spool():
+    os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=EXPORT_CACHE_DIR, prefix=".partial_", delete=False)
+
+def discard_artifact(spool_path: str):
+    try:
+        os.remove(spool_path)
+    except FileNotFoundError:
+        pass
+
+def store_artifact(spool_path: str, kind: str, object_id: int, key: str, extension: str):
+    path = artifact_path(kind, object_id, key, extension)
+    with _lock:
+        os.replace(spool_path, path)
+        _remove_stale_versions(kind, object_id, os.path.basename(path))
+        _evict()
+    return path
+
+def _remove_stale_versions(kind: str, object_id: int, current_name: str):
+    prefix = _prefix(kind, object_id)
+    for entry in os.scandir(EXPORT_CACHE_DIR):
+        if entry.name.startswith(prefix) and entry.name != current_name:
+            discard_artifact(entry.path)
+
+def _evict():
+    entries = []
+    for entry in os.scandir(EXPORT_CACHE_DIR):
+        if entry.name.startswith(".partial_") or not entry.is_file():
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    # Least recently used first; get_artifact refreshes mtime on every hit
+    for _, size, path in sorted(entries):
+        if total <= EXPORT_CACHE_MAX_BYTES:
+            break
+        discard_artifact(path)
+        total -= size
@@ -0,0 +1,28 @@
+# --- Sparse Fieldsets ---
+# `fields=name,is_archived` picks a resource's scalar columns (id is always
+# returned) and `include=skills,milestones` picks its relationships. Routes
+# turn both into loader options, so unrequested columns are never selected
+# and unrequested relationships are never queried.
+
+class InvalidSelection(ValueError):
+    pass
+
+def _parse_list(value: str, allowed: tuple, parameter: str):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(allowed))
+    if unknown:
+        raise InvalidSelection(f"Unknown {parameter}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return names
+
+# Requested scalar fields in declaration order; `default` (or all of them) when the parameter is absent
+def parse_fields(args, allowed: tuple, default: tuple | None = None):
+    if "fields" not in args:
+        return [name for name in allowed if default is None or name in default]
+    requested = set(_parse_list(args["fields"], allowed, "fields"))
+    return [name for name in allowed if name in requested]
+
+# Requested relationships; `default` when the parameter is absent, none for `include=`
+def parse_include(args, allowed: tuple, default: tuple):
+    if "include" not in args:
+        return set(default)
+    return set(_parse_list(args["include"], allowed, "include"))
@@ -0,0 +1,84 @@
+import dataclasses
+import decimal
+import enum
+import json
+import uuid
+from datetime import date, datetime, timezone
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup; the stdlib encoder below is used without it
+    orjson = None
+
+# --- JSON Provider ---
+# All responses go through this provider (see app.main). orjson is used when
+# installed; otherwise the stdlib encoder produces the same output:
+# - SkillStatus and other enums encode as their value ("Red")
+# - datetimes and dates encode as ISO 8601; naive datetimes are UTC
+# - Decimal encodes as a string, as with Flask's default provider
+
+def _default(value):
+    # Types neither encoder handles natively
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _stdlib_default(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return _default(value)
+
+def _stdlib_dumps(obj, sort_keys: bool = True, **kwargs):
+    kwargs.setdefault("default", _stdlib_default)
+    kwargs.setdefault("ensure_ascii", False)
+    kwargs.setdefault("separators", (",", ":"))
+    return json.dumps(obj, sort_keys=sort_keys, **kwargs)
+
+# Encodes obj to UTF-8 JSON bytes
+def dumps_bytes(obj, sort_keys: bool = True):
+    if orjson is not None:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
+    return _stdlib_dumps(obj, sort_keys).encode("utf-8")
+
+class FastJSONProvider(JSONProvider):
+    sort_keys = True
+    mimetype = "application/json"
+
+    def dumps_bytes(self, obj, **kwargs):
+        if not kwargs:
+            return dumps_bytes(obj, self.sort_keys)
+        return self.dumps(obj, **kwargs).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode("utf-8")
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return _stdlib_dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    # Same as JSONProvider.response, but hands the encoded bytes straight to
+    # the response instead of round-tripping through str
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
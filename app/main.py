@@ -1,15 +1,25 @@
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
-from app.database import SessionLocal
+from app.database import SessionLocal, ReadSessionLocal
+from app.read_routing import record_write
+from app.auth import require_user
+from app.json_provider import FastJSONProvider
 
 app = Flask(__name__)
+# orjson-backed encoding for every jsonify() call (see app.json_provider)
+app.json = FastJSONProvider(app)
 # Allow all origins for now to prevent blocking, restrict in production if needed
-CORS(app, resources={r"/*": {"origins": "*"}})
+CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor"])
 
 @app.teardown_appcontext
 def shutdown_session(exception=None):
     if SessionLocal:
         SessionLocal.remove()
+    if ReadSessionLocal is not SessionLocal:
+        ReadSessionLocal.remove()
+
+app.after_request(record_write)
 
 @app.route("/")
 def read_root():
@@ -26,10 +36,49 @@ from app.routes.student_routes import student_bp
 from app.routes.analytics_routes import analytics_bp
 from app.routes.export_routes import export_bp
 
+# Everything except login/setup needs a bearer token
+for protected_bp in (class_bp, skill_bp, student_bp, analytics_bp, export_bp):
+    protected_bp.before_request(require_user)
+
 app.register_blueprint(auth_bp)
 app.register_blueprint(user_bp)
 app.register_blueprint(class_bp)
 app.register_blueprint(skill_bp)
 app.register_blueprint(student_bp)
 app.register_blueprint(analytics_bp)
-app.register_blueprint(export_bp)
\ No newline at end of file
+app.register_blueprint(export_bp)
+
+# Mail left queued by a previous run is sent without waiting for new mail
+from app.email_utils import get_mail_worker, start_worker_if_pending
+
+@app.before_request
+def start_mail_worker():
+    start_worker_if_pending()
+
+# --- CLI Commands ---
+from app.crud import summary_crud
+
+@app.cli.command("analytics-summary")
+@click.option("--verify", is_flag=True, help="Compare the summary tables against the base tables without changing them.")
+def analytics_summary_command(verify):
+    """Rebuild (or verify) the precomputed class analytics summary."""
+    db = SessionLocal()
+    try:
+        if verify:
+            mismatches = summary_crud.verify_summary(db)
+            for mismatch in mismatches:
+                click.echo(mismatch)
+            if mismatches:
+                raise SystemExit(1)
+            click.echo("Analytics summary is consistent.")
+        else:
+            skill_rows, weighted_rows = summary_crud.rebuild_summary(db)
+            click.echo(f"Rebuilt {skill_rows} skill rows and {weighted_rows} weighted rows.")
+    finally:
+        db.close()
+
+@app.cli.command("send-mail")
+def send_mail_command():
+    """Deliver every queued email that is due, then exit."""
+    sent = get_mail_worker().drain()
+    click.echo(f"Processed {sent} queued emails.")
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, DateTime
+from app.database import Base
+
+# Response cache versions (see app.response_cache), shared by every worker
+class ResponseCacheVersion(Base):
+    __tablename__ = "response_cache_versions"
+
+    # Class id, or 0 for responses that span every class
+    scope = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
+    bumped_at = Column(DateTime, nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from app.database import Base
+
+class OutboundEmail(Base):
+    __tablename__ = "outbound_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending / sent / failed
+    attempts = Column(Integer, nullable=False, default=0)
+    # Earliest time the worker may (re)try; also the lease while a send is in flight
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(String(500))
+    created_at = Column(DateTime, nullable=False)
+    sent_at = Column(DateTime)
+
+    # The worker polls for due pending messages
+    __table_args__ = (Index("ix_outbound_emails_status_next_attempt_at", "status", "next_attempt_at"),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Enum, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -25,18 +25,28 @@ class Student(Base):
     class_id = Column(Integer, ForeignKey("classes.id"))
     enrolled_class = relationship("Class", back_populates="students")
     skills = relationship("Skill", back_populates="student", cascade="all, delete-orphan")
-    milestones = relationship("Milestone", back_populates="student", cascade="all, delete-orphan")
+    # Newest first, sorted by the database along ix_milestones_student_id_timestamp
+    milestones = relationship(
+        "Milestone", back_populates="student", cascade="all, delete-orphan",
+        order_by="(Milestone.timestamp.desc(), Milestone.id.desc())"
+    )
+
+    # Roster reads always filter on class + archive flag; also serves class_id lookups
+    __table_args__ = (Index("ix_students_class_id_is_archived", "class_id", "is_archived"),)
 
 class Skill(Base):
     __tablename__ = "skills"
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(50), nullable=False)
+    name = Column(String(50), nullable=False, index=True)
     current_status = Column(Enum(SkillStatus), default=SkillStatus.RED)
     score = Column(Integer, default=0) # Score out of 25
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     student_id = Column(Integer, ForeignKey("students.id"))
     student = relationship("Student", back_populates="skills")
 
+    # Skill lookups by student or (student, name) and per-class status aggregates
+    __table_args__ = (Index("ix_skills_student_id_name_status", "student_id", "name", "current_status"),)
+
 class Milestone(Base):
     __tablename__ = "milestones"
     id = Column(Integer, primary_key=True, index=True)
@@ -47,6 +57,31 @@ class Milestone(Base):
     progress_value = Column(String(255))
     # --- ADD THIS NEW COLUMN ---
     narrative = Column(String(1024))
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     student_id = Column(Integer, ForeignKey("students.id"))
-    student = relationship("Student", back_populates="milestones")
\ No newline at end of file
+    student = relationship("Student", back_populates="milestones")
+
+    # Per-student lookups, history and time-windowed trend scans
+    __table_args__ = (Index("ix_milestones_student_id_timestamp", "student_id", "timestamp"),)
+
+# --- Precomputed class analytics, kept in step by app.crud.summary_crud ---
+
+class ClassSkillSummary(Base):
+    __tablename__ = "class_skill_summary"
+    id = Column(Integer, primary_key=True, index=True)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
+    skill_name = Column(String(50), nullable=False)
+    red = Column(Integer, nullable=False, default=0)
+    yellow = Column(Integer, nullable=False, default=0)
+    green = Column(Integer, nullable=False, default=0)
+    gold = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (UniqueConstraint("class_id", "skill_name", name="uq_class_skill_summary_class_id_skill_name"),)
+
+class ClassWeightedSummary(Base):
+    __tablename__ = "class_weighted_summary"
+    class_id = Column(Integer, ForeignKey("classes.id"), primary_key=True)
+    red = Column(Integer, nullable=False, default=0)
+    yellow = Column(Integer, nullable=False, default=0)
+    green = Column(Integer, nullable=False, default=0)
+    gold = Column(Integer, nullable=False, default=0)
\ No newline at end of file
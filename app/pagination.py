@@ -0,0 +1,32 @@
+import base64
+import json
+
+# --- Keyset Pagination Cursors ---
+# A cursor is the sort key of the last row on the previous page, JSON-encoded
+# and base64url'd so clients treat it as opaque. Pages are fetched with
+# WHERE key > cursor ORDER BY key, which stays an index range scan however
+# deep the page and never repeats or skips rows when data changes in between.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(key: list):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+# Returns the key list, checking it has one value of each expected type
+def decode_cursor(cursor: str, types: tuple):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(key, list) or len(key) != len(types) or not all(type(value) is t for value, t in zip(key, types)):
+        raise InvalidCursor("Invalid cursor")
+    return key
+
+# Adds the next-page cursor header to a response when there is a next page
+def with_next_cursor(response, key: list | None):
+    if key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key)
+    return response
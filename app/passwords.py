@@ -0,0 +1,79 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration
+# bcrypt cost factor; stored hashes with a different cost are rehashed on
+# the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS") or 12)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS") or 0) or os.cpu_count() or 1
+# Hash/verify calls allowed to wait for a worker before callers get PasswordPoolBusy
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING") or 0) or PASSWORD_HASH_WORKERS * 8
+# Suggested Retry-After (seconds) for requests turned away by a full queue
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER") or 1)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Raised when the password worker queue is full
+class PasswordPoolBusy(Exception):
+    pass
+
+# --- Worker Functions (run in the pool processes) ---
+def _hash(password: str):
+    return pwd_context.hash(password)
+
+def _verify(password: str, hashed_password: str):
+    # (matches, replacement hash or None)
+    return pwd_context.verify_and_update(password, hashed_password)
+
+# --- Pool ---
+# bcrypt is CPU-bound and would otherwise run on the request thread. A small
+# process pool keeps it off the web workers; the pending limit turns a login
+# storm into fast 503s instead of an unbounded backlog.
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+def _get_pool():
+    global _pool, _pool_pid
+    with _lock:
+        # A forked web worker must not reuse its parent's pool
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+            _pool_pid = os.getpid()
+        return _pool
+
+# Returns a concurrent.futures.Future; raises PasswordPoolBusy when the queue is full
+def submit(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordPoolBusy()
+    try:
+        future = _get_pool().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+def hash_password(password: str):
+    return submit(_hash, password).result()
+
+# Future of (matches, new_hash); new_hash is set when the stored hash should be replaced.
+# Async callers await it with asyncio.wrap_future.
+def submit_verify(password: str, hashed_password: str):
+    return submit(_verify, password, hashed_password)
+
+def verify_password(password: str, hashed_password: str):
+    return submit_verify(password, hashed_password).result()
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,35 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration
+# Worker processes for PDF rendering (class pdf.zip exports and the ASGI
+# student export); unset means one per CPU
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS") or 0) or None
+
+# --- Pool ---
+# reportlab is CPU-bound. One pool per process is created on first use and
+# shared by every export, so requests neither pay for worker start-up nor
+# multiply the number of rendering processes when they run concurrently.
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+
+def get_pool():
+    global _pool, _pool_pid
+    with _lock:
+        # A forked web worker must not reuse its parent's pool
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=PDF_RENDER_WORKERS)
+            _pool_pid = os.getpid()
+        return _pool
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,65 @@
+from flask import request, g
+from dotenv import load_dotenv
+import math
+import os
+import threading
+import time
+
+from app.database import SessionLocal, ReadSessionLocal, DATABASE_READ_URL
+
+load_dotenv()
+
+# Configuration
+# After a client writes, its reads stay on the primary for this many seconds
+# so it never sees replica lag on its own changes.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS") or 5)
+WRITE_COOKIE_NAME = "last_db_write"
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Last write per client, for clients that do not send cookies back (CORS
+# without credentials); the cookie covers requests served by other processes.
+_recent_writes = {}
+_lock = threading.Lock()
+
+def _client_key():
+    return request.headers.get("Authorization") or request.remote_addr
+
+def _prune(now: float):
+    expired = [key for key, written_at in _recent_writes.items() if now - written_at > READ_YOUR_WRITES_SECONDS]
+    for key in expired:
+        del _recent_writes[key]
+
+# after_request hook: remember successful writes
+def record_write(response):
+    if not DATABASE_READ_URL or request.method not in WRITE_METHODS or response.status_code >= 400:
+        return response
+
+    now = time.time()
+    with _lock:
+        if len(_recent_writes) > 10000:
+            _prune(now)
+        _recent_writes[_client_key()] = now
+    response.set_cookie(WRITE_COOKIE_NAME, f"{now:.3f}", max_age=math.ceil(READ_YOUR_WRITES_SECONDS), samesite="Lax")
+    return response
+
+def wrote_recently():
+    now = time.time()
+    try:
+        if now - float(request.cookies.get(WRITE_COOKIE_NAME, "0")) <= READ_YOUR_WRITES_SECONDS:
+            return True
+    except ValueError:
+        pass
+    with _lock:
+        written_at = _recent_writes.get(_client_key())
+    return written_at is not None and now - written_at <= READ_YOUR_WRITES_SECONDS
+
+# Sends the rest of this request's reads to the primary, e.g. when its result
+# will be cached for every client (see app.response_cache)
+def use_primary():
+    g.read_from_primary = True
+
+# Session for read-only routes: the replica, unless this client just wrote
+def get_read_db():
+    if not DATABASE_READ_URL or g.get("read_from_primary") or wrote_recently():
+        return SessionLocal()
+    return ReadSessionLocal()
@@ -0,0 +1,219 @@
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import request, make_response, g, has_request_context
+from sqlalchemy import select, update, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from dotenv import load_dotenv
+
+from app import read_routing
+from app.database import SessionLocal, engine
+from app.crud import student_crud
+from app.models.cache_model import ResponseCacheVersion
+
+load_dotenv()
+
+# Configuration
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES") or 1024)
+# Backstop for changes that never call bump_classes (a crash between commit
+# and bump, manual SQL); writes through the app invalidate immediately.
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS") or 60)
+
+# In-process cache for the analytics and roster GET endpoints. Every cache key
+# includes the version of the class the response is about; write paths call
+# bump_classes after committing, so older entries are simply never looked up
+# again and fall out of the LRU. The class list depends on every class and
+# uses the global version (scope 0), which every bump also advances.
+#
+# The entries are per process but the versions live in the
+# response_cache_versions table, so a write served by one gunicorn worker
+# invalidates every worker's entries: each cached request reads its scope's
+# version with one primary-key lookup on the primary.
+
+GLOBAL_SCOPE = 0
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> (etag, body, mimetype, headers, stored_at)
+# student id -> (class id, that class's version when looked up); moving a
+# student bumps the old class, which retires the mapping
+_student_classes = OrderedDict()
+# Headers that belong to a response's representation and are rebuilt on replay
+_REBUILT_HEADERS = {"content-length", "content-type", "etag", "cache-control", "x-cache"}
+_stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+def _scope(class_id: int | None):
+    return GLOBAL_SCOPE if class_id is None else class_id
+
+# (version, bumped_at) of a class, read once per request
+def _class_state(class_id: int | None):
+    scope = _scope(class_id)
+    states = g.setdefault("response_cache_versions", {}) if has_request_context() else {}
+    if scope not in states:
+        table = ResponseCacheVersion.__table__
+        with engine.connect() as connection:
+            row = connection.execute(select(table.c.version, table.c.bumped_at).where(table.c.scope == scope)).first()
+        states[scope] = (row.version, row.bumped_at) if row is not None else (0, None)
+    return states[scope]
+
+def class_version(class_id: int | None):
+    return _class_state(class_id)[0]
+
+def bump_classes(*class_ids):
+    now = datetime.utcnow()
+    # Sorted, so concurrent bumps lock the rows in the same order
+    scopes = sorted({_scope(class_id) for class_id in class_ids} | {GLOBAL_SCOPE})
+    with engine.begin() as connection:
+        for scope in scopes:
+            _bump_version(connection, scope, now)
+    if has_request_context():
+        g.pop("response_cache_versions", None)
+
+def _bump_version(connection, scope: int, now: datetime):
+    table = ResponseCacheVersion.__table__
+    changes = {"version": table.c.version + 1, "bumped_at": now}
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        upsert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        connection.execute(upsert(table).values(scope=scope, version=1, bumped_at=now).on_conflict_do_update(index_elements=["scope"], set_=changes))
+    elif dialect in ("mysql", "mariadb"):
+        connection.execute(mysql_insert(table).values(scope=scope, version=1, bumped_at=now).on_duplicate_key_update(changes))
+    else:
+        # UPDATE, then INSERT in a savepoint, as summary_crud does
+        query = update(table).where(table.c.scope == scope).values(**changes)
+        if connection.execute(query).rowcount:
+            return
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(table).values(scope=scope, version=1, bumped_at=now))
+        except IntegrityError:
+            connection.execute(query)
+
+# A replica may not have a write yet for READ_YOUR_WRITES_SECONDS after it;
+# a response cached under the new version in that window would serve the
+# old data to every client, so those fills read from the primary instead.
+def _bumped_recently(class_id: int | None):
+    bumped_at = _class_state(class_id)[1]
+    return bumped_at is not None and datetime.utcnow() - bumped_at <= timedelta(seconds=read_routing.READ_YOUR_WRITES_SECONDS)
+
+def clear():
+    with _lock:
+        _entries.clear()
+        _student_classes.clear()
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"] = len(_entries)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+def _get(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and time.monotonic() - entry[4] > RESPONSE_CACHE_TTL_SECONDS:
+            del _entries[key]
+            entry = None
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+        return entry
+
+def _put(key, entry):
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > RESPONSE_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+
+def _etag_matches(etag: str):
+    header = request.headers.get("If-None-Match", "")
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+def _respond(etag: str, body: bytes, mimetype: str, headers: list, cache_status: str):
+    if _etag_matches(etag):
+        with _lock:
+            _stats["not_modified"] += 1
+        response = make_response("", 304)
+    else:
+        response = make_response(body)
+        response.mimetype = mimetype
+    response.headers.extend(headers)
+    response.headers["ETag"] = etag
+    # Clients may keep the body but must revalidate it on every use
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Cache"] = cache_status
+    return response
+
+# Decorator for GET views. `scope(**view_args)` returns the class id the
+# response depends on (None for responses that span every class).
+def cached_response(scope):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**view_args):
+            class_id = scope(**view_args)
+            key = (request.endpoint, request.full_path, class_version(class_id))
+            entry = _get(key)
+            if entry is not None:
+                return _respond(*entry[:4], "HIT")
+
+            if read_routing.DATABASE_READ_URL and _bumped_recently(class_id):
+                read_routing.use_primary()
+            response = make_response(view(**view_args))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            # Strong validator: identical bytes, identical tag
+            etag = f'"{hashlib.sha256(body).hexdigest()}"'
+            headers = [(name, value) for name, value in response.headers if name.lower() not in _REBUILT_HEADERS]
+            _put(key, (etag, body, response.mimetype, headers, time.monotonic()))
+            return _respond(etag, body, response.mimetype, headers, "MISS")
+        return wrapper
+    return decorator
+
+# Common scopes
+def by_class_id(class_id, **view_args):
+    return class_id
+
+def all_classes(**view_args):
+    return None
+
+def by_student_id(student_id, **view_args):
+    # Student responses change with their class (averages, promotion), so
+    # they share its version. The class is looked up once and reused while
+    # that class's version stands, so a cache hit costs no student query.
+    with _lock:
+        known = _student_classes.get(student_id)
+    if known is not None and class_version(known[0]) == known[1]:
+        return known[0]
+
+    # Read on the primary, and again after the version: a move committed in
+    # between shows up as a different class instead of a stale mapping
+    db = SessionLocal()
+    try:
+        class_id = student_crud.get_student_class_id(db, student_id)
+        while True:
+            version = class_version(class_id)
+            db.rollback()  # a fresh snapshot for the second read
+            confirmed = student_crud.get_student_class_id(db, student_id)
+            if confirmed == class_id:
+                break
+            class_id = confirmed
+    finally:
+        db.close()
+    with _lock:
+        _student_classes[student_id] = (class_id, version)
+        _student_classes.move_to_end(student_id)
+        while len(_student_classes) > RESPONSE_CACHE_MAX_ENTRIES:
+            _student_classes.popitem(last=False)
+    return class_id
@@ -1,12 +1,15 @@
 from flask import Blueprint, jsonify, request
 from app.database import SessionLocal
-from app.crud import analytics_crud, student_crud
+from app.read_routing import get_read_db
+from app.crud import analytics_crud, class_crud
+from app import response_cache
 
 analytics_bp = Blueprint('analytics', __name__)
 
 @analytics_bp.route("/api/analytics/class/<int:class_id>/by-skill", methods=["GET"])
+@response_cache.cached_response(response_cache.by_class_id)
 def read_analytics_by_skill(class_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
         # The frontend expects a dictionary: {"listening": {"red": 0...}, ...}
         # CRUD returns exactly this structure.
@@ -16,8 +19,9 @@ def read_analytics_by_skill(class_id):
         db.close()
 
 @analytics_bp.route("/api/analytics/class/<int:class_id>/weighted-distribution", methods=["GET"])
+@response_cache.cached_response(response_cache.by_class_id)
 def read_weighted_distribution(class_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
         result = analytics_crud.get_weighted_student_distribution(db, class_id=class_id)
         # Frontend expects: { "red": X, "yellow": Y... }
@@ -27,37 +31,45 @@ def read_weighted_distribution(class_id):
         db.close()
 
 @analytics_bp.route("/api/analytics/class/<int:class_id>/trends", methods=["GET"])
+@response_cache.cached_response(response_cache.by_class_id)
 def read_skill_trends(class_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
         days = int(request.args.get('days', 30))
-        result = analytics_crud.get_skill_trends(db, class_id=class_id, days=days)
+        bucket = request.args.get('bucket') or None
+        if bucket is not None and bucket not in analytics_crud.TREND_BUCKETS:
+            return jsonify({"detail": "bucket must be one of: day, week, month"}), 422
+        result = analytics_crud.get_skill_trends(db, class_id=class_id, days=days, bucket=bucket)
         # Frontend expects: { "listening": {"improvements": X, "declines": Y}, ... }
-        # CRUD returns exactly this structure.
+        # or, with ?bucket=, { "listening": [{"start": "...", "improvements": X, "declines": Y}, ...], ... }
+        return jsonify(result)
+    finally:
+        db.close()
+
+@analytics_bp.route("/api/analytics/class/<int:class_id>/dashboard", methods=["GET"])
+@response_cache.cached_response(response_cache.by_class_id)
+def read_class_dashboard(class_id):
+    db = get_read_db()
+    try:
+        if class_crud.get_class(db, class_id=class_id) is None:
+            return jsonify({"detail": "Class not found"}), 404
+
+        days = int(request.args.get('days', 30))
+        # Frontend gets by-skill, weighted-distribution, trends and every
+        # student's comparison in one response instead of four+ requests.
+        result = analytics_crud.get_class_dashboard(db, class_id=class_id, days=days)
         return jsonify(result)
     finally:
         db.close()
 
 @analytics_bp.route("/api/analytics/student/<int:student_id>/comparison", methods=["GET"])
+@response_cache.cached_response(response_cache.by_student_id)
 def read_student_comparison(student_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
-        student = student_crud.get_student_by_id(db, student_id=student_id)
-        if not student:
+        comparison = analytics_crud.get_student_comparison(db, student_id=student_id)
+        if comparison is None:
              return jsonify({"detail": "Student not found"}), 404
-
-        class_averages = analytics_crud.get_class_average_scores(db, class_id=student.class_id)
-        
-        comparison = []
-        for skill in student.skills:
-             # Need to map Enum to Score if not done in CRUD or if strictly using schemas
-             # Replicating logic from router:
-             score = analytics_crud.SCORE_MAP.get(skill.current_status, 0)
-             comparison.append({
-                "skill_name": skill.name,
-                "student_score": score,
-                "class_average_score": float(class_averages.get(skill.name.lower()) or 0.0)
-            })
         return jsonify(comparison)
     finally:
         db.close()
@@ -2,7 +2,6 @@ from flask import Blueprint, request, jsonify, make_response
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 from jose import jwt
-from passlib.context import CryptContext
 import os
 from pydantic import ValidationError
 
@@ -11,9 +10,9 @@ from app.schemas.user_schema import Token, UserCreate, SetupRequest, SetupComple
 from app.crud import user_crud
 from app.email_utils import send_verification_email, verification_codes
 from app.models.user_model import User
+from app import passwords
 
 auth_bp = Blueprint('auth', __name__)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
@@ -29,6 +28,11 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _busy_response():
+    response = jsonify({"detail": "Too many login attempts in progress, try again shortly."})
+    response.headers["Retry-After"] = str(passwords.PASSWORD_HASH_RETRY_AFTER)
+    return response, 503
+
 def get_db():
     session = SessionLocal()
     try:
@@ -50,7 +54,8 @@ def request_setup_code():
         if db.query(User).count() > 0:
             return jsonify({"detail": "An admin account already exists. Setup is not allowed."}), 403
 
-        send_verification_email(req_data.email)
+        # Only queued here; the mail worker delivers it in the background
+        send_verification_email(db, req_data.email)
         return jsonify({"message": "Verification code sent successfully."})
     finally:
         db.close()
@@ -78,6 +83,8 @@ def complete_setup():
         return jsonify({"message": "Setup complete. You can now log in."})
     except IntegrityError:
          return jsonify({"detail": "User likely already exists."}), 400
+    except passwords.PasswordPoolBusy:
+        return _busy_response()
     finally:
         db.close()
 
@@ -101,8 +108,20 @@ def login_for_access_token():
              return jsonify({"detail": "Missing username or password"}), 400
 
         user = user_crud.get_user_by_email(db, email=username)
-        if not user or not pwd_context.verify(password, user.hashed_password):
+        if not user:
+            return jsonify({"detail": "Incorrect email or password"}), 401
+
+        # bcrypt runs on the password pool, never on this request thread
+        try:
+            verified, new_hash = passwords.verify_password(password, user.hashed_password)
+        except passwords.PasswordPoolBusy:
+            return _busy_response()
+        if not verified:
             return jsonify({"detail": "Incorrect email or password"}), 401
+        if new_hash:
+            # Stored with an outdated cost factor; upgrade while we have the password
+            user.hashed_password = new_hash
+            db.commit()
         
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -1,13 +1,20 @@
 from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
 from app.database import SessionLocal
-from app.schemas.class_schema import ClassCreate
+from app.read_routing import get_read_db
+from app.schemas.class_schema import ClassCreate, ClassRollover
 from app.schemas.student_schema import StudentCreate
-from app.crud import class_crud, student_crud, analytics_crud
+from app.crud import class_crud, student_crud, analytics_crud, import_crud
+from app import response_cache
 from app.models.user_model import User
+from app import pagination, field_selection
+from app.serializers import serialize_student
 
 class_bp = Blueprint('classes', __name__)
 
+ROSTER_FIELDS = ("name", "is_archived")
+ROSTER_INCLUDES = ("skills", "milestones", "enrolled_class")
+
 @class_bp.route("/api/classes/", methods=["POST"])
 def create_new_class():
     db = SessionLocal()
@@ -26,27 +33,89 @@ def create_new_class():
     finally:
         db.close()
 
+@class_bp.route("/api/classes/import", methods=["POST"])
+def import_roster():
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"detail": "Upload a CSV or XLSX file in the 'file' field"}), 422
+    if not upload.filename.lower().endswith((".csv", ".xlsx")):
+        return jsonify({"detail": "Only .csv and .xlsx files are supported"}), 422
+
+    db = SessionLocal()
+    try:
+        # Rows are parsed incrementally and committed in chunks; the report
+        # lists every row that could not be imported.
+        try:
+            rows = import_crud.iter_upload_rows(upload.stream, upload.filename)
+        except import_crud.InvalidUpload as e:
+            return jsonify({"detail": str(e)}), 422
+        report = import_crud.import_roster(db, rows)
+        return jsonify(report)
+    finally:
+        db.close()
+
+@class_bp.route("/api/classes/rollover", methods=["POST"])
+def rollover_classes():
+    db = SessionLocal()
+    try:
+        data = request.get_json()
+        try:
+            rollover = ClassRollover(**data)
+        except ValidationError as e:
+            return jsonify({"detail": e.errors()}), 422
+
+        if not rollover.mapping:
+            return jsonify({"detail": "Mapping must contain at least one class"}), 422
+        if any(source_id == target_id for source_id, target_id in rollover.mapping.items()):
+            return jsonify({"detail": "A class cannot be promoted into itself"}), 422
+
+        class_ids = set(rollover.mapping) | set(rollover.mapping.values())
+        found_ids = {c.id for c in class_crud.get_classes_by_ids(db, class_ids)}
+        missing_ids = sorted(class_ids - found_ids)
+        if missing_ids:
+            return jsonify({"detail": f"Classes not found: {missing_ids}"}), 404
+
+        result = student_crud.promote_classes(
+            db, mapping=rollover.mapping, include_archived=rollover.include_archived, dry_run=rollover.dry_run
+        )
+        return jsonify(result)
+    finally:
+        db.close()
+
 @class_bp.route("/api/classes/", methods=["GET"])
+@response_cache.cached_response(response_cache.all_classes)
 def read_classes():
-    db = SessionLocal()
+    db = get_read_db()
     try:
-        skip = int(request.args.get('skip', 0))
-        limit = int(request.args.get('limit', 100))
-        classes = class_crud.get_classes(db, skip=skip, limit=limit)
-        
+        limit = max(1, request.args.get('limit', 100, type=int))
+        cursor = request.args.get('cursor')
+        next_key = None
+        if 'skip' in request.args and cursor is None:
+            # Offset pagination, kept for existing clients
+            classes = class_crud.get_classes(db, skip=max(0, request.args.get('skip', 0, type=int)), limit=limit)
+        else:
+            # Keyset pagination on (name, id); follow X-Next-Cursor for the next page
+            try:
+                after = pagination.decode_cursor(cursor, (str, int)) if cursor else None
+            except pagination.InvalidCursor as e:
+                return jsonify({"detail": str(e)}), 422
+            classes, next_key = class_crud.get_classes_page(db, after=after, limit=limit)
+
+        # Fixed query count per page: classes, student ids, grouped distribution
+        class_ids = [c.id for c in classes]
+        student_ids = student_crud.get_student_ids_by_class_ids(db, class_ids)
+        distributions = analytics_crud.get_weighted_distributions_for_classes(db, class_ids)
+
         result = []
         for c in classes:
-            students_list = [{"id": s.id} for s in c.students] 
-            analytics_data = analytics_crud.get_weighted_student_distribution(db, c.id)
-            
             result.append({
                 "id": c.id,
                 "name": c.name,
-                "students": students_list,
-                "analytics_summary": analytics_data
+                "students": [{"id": student_id} for student_id in student_ids[c.id]],
+                "analytics_summary": distributions[c.id]
             })
 
-        return jsonify(result)
+        return pagination.with_next_cursor(jsonify(result), next_key)
     finally:
         db.close()
 
@@ -87,31 +156,58 @@ def create_student_in_class(class_id):
         db.close()
 
 @class_bp.route("/api/classes/<int:class_id>/students", methods=["GET"])
+@response_cache.cached_response(response_cache.by_class_id)
 def read_class_students(class_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
-        skip = int(request.args.get('skip', 0))
-        limit = int(request.args.get('limit', 100))
+        limit = max(1, request.args.get('limit', 100, type=int))
         include_archived = request.args.get('include_archived', 'false').lower() == 'true'
-        
-        students = student_crud.get_students_by_class_id(db, class_id=class_id, skip=skip, limit=limit, include_archived=include_archived)
-        return jsonify([{
-            "id": s.id,
-            "name": s.name,
-            "is_archived": s.is_archived,
-            "skills": [{
-                "id": skill.id,
-                "name": skill.name,
-                "current_status": skill.current_status.value if hasattr(skill.current_status, 'value') else skill.current_status,
-                "score": skill.score,
-                "last_updated": skill.last_updated
-            } for skill in s.skills],
-            "milestones": [{
-                "id": m.id,
-                "skill_name": m.skill_name,
-                "new_status": m.new_status.value if hasattr(m.new_status, 'value') else m.new_status,
-                "timestamp": m.timestamp
-            } for m in s.milestones]
-        } for s in students])
+        # Optional cap on milestones per student instead of the full history
+        recent_milestones = request.args.get('recent_milestones', type=int)
+        cursor = request.args.get('cursor')
+        # ?fields= and ?include= trim the response; the class picker only needs
+        # `fields=name&include=`, which is a single query
+        try:
+            fields = field_selection.parse_fields(request.args, student_crud.STUDENT_FIELDS, default=ROSTER_FIELDS)
+            include = field_selection.parse_include(request.args, ROSTER_INCLUDES, default=("skills", "milestones"))
+        except field_selection.InvalidSelection as e:
+            return jsonify({"detail": str(e)}), 422
+        load = {
+            "fields": fields,
+            "load_skills": "skills" in include,
+            "load_milestones": "milestones" in include and recent_milestones is None,
+        }
+
+        next_key = None
+        if 'skip' in request.args and cursor is None:
+            # Offset pagination, kept for existing clients
+            students = student_crud.get_students_by_class_id(
+                db, class_id=class_id, skip=max(0, request.args.get('skip', 0, type=int)), limit=limit, include_archived=include_archived, **load
+            )
+        else:
+            # Keyset pagination on id; one extra row tells whether a next page exists
+            try:
+                after_id = pagination.decode_cursor(cursor, (int,))[0] if cursor else None
+            except pagination.InvalidCursor as e:
+                return jsonify({"detail": str(e)}), 422
+            students = student_crud.get_students_by_class_id(
+                db, class_id=class_id, limit=limit + 1, include_archived=include_archived, after_id=after_id, **load
+            )
+            if len(students) > limit:
+                students = students[:limit]
+                next_key = [students[-1].id]
+        milestones = None
+        if "milestones" in include:
+            if recent_milestones is None:
+                milestones = {s.id: s.milestones for s in students}
+            else:
+                milestones = student_crud.get_recent_milestones_by_student(db, [s.id for s in students], recent_milestones)
+        # Every student on the roster is in this class
+        enrolled_class = class_crud.get_class(db, class_id=class_id) if "enrolled_class" in include else None
+
+        return pagination.with_next_cursor(jsonify([
+            serialize_student(s, fields, include, milestones=milestones[s.id] if milestones is not None else None, enrolled_class=enrolled_class)
+            for s in students
+        ]), next_key)
     finally:
         db.close()
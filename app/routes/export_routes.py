@@ -1,70 +1,130 @@
-from flask import Blueprint, jsonify, Response, send_file
+from flask import Blueprint, jsonify, Response, send_file, stream_with_context, current_app
 from app.database import SessionLocal
-from app.crud import export_crud
+from app.read_routing import get_read_db
+from app.crud import export_crud, class_crud, student_crud
+from app import export_cache
 import io
 import csv
-import xlsxwriter
+import time
+import zipfile
 
 export_bp = Blueprint('export', __name__)
 
+CSV_CHUNK_SIZE = 64 * 1024
+
+# Write-only, unseekable sink that hands zip output back in chunks
+class _ZipChunkStream(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        chunk = b"".join(self._chunks)
+        self._chunks.clear()
+        return chunk
+
+# Cached artifacts are plain files, so send_file handles If-None-Match and Range
+def _send_artifact(path, key, mimetype, download_name):
+    return send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name,
+        etag=key,
+        conditional=True,
+        max_age=0
+    )
+
 @export_bp.route("/api/export/class/<int:class_id>/csv", methods=["GET"])
 def export_class_as_csv(class_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
-        result = export_crud.generate_class_report_data(db, class_id)
-        if result is None:
+        if class_crud.get_class(db, class_id=class_id) is None:
              return jsonify({"detail": "Class not found or has no students"}), 404
-        
-        data, columns = result
-
-        stream = io.StringIO()
-        writer = csv.DictWriter(stream, fieldnames=columns)
-        writer.writeheader()
-        writer.writerows(data)
-        
-        # Convert StringIO to BytesIO for send_file if needed/preferred, or use Response directly
-        output = io.BytesIO(stream.getvalue().encode('utf-8'))
-        
-        return send_file(
-            output,
-            mimetype="text/csv",
-            as_attachment=True,
-            download_name=f"class_{class_id}_report.csv"
-        )
+
+        key = export_cache.artifact_key("class_csv", class_id, export_crud.get_class_data_version(db, class_id))
+        cached_path = export_cache.get_artifact("class_csv", class_id, key, "csv")
+        if cached_path:
+            return _send_artifact(cached_path, key, "text/csv", f"class_{class_id}_report.csv")
     finally:
         db.close()
 
+    # Rows are written and sent as the cursor produces them, and teed into the
+    # export cache; the generator owns its own session because it keeps
+    # running after this view has returned.
+    def generate():
+        stream_db = get_read_db()
+        spool = export_cache.open_artifact_spool()
+        stored = False
+        try:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=export_crud.REPORT_COLUMNS)
+
+            def flush():
+                chunk = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                spool.write(chunk.encode('utf-8'))
+                return chunk
+
+            writer.writeheader()
+            yield flush()
+            for row in export_crud.iter_class_report_rows(stream_db, class_id):
+                writer.writerow(row)
+                if buffer.tell() >= CSV_CHUNK_SIZE:
+                    yield flush()
+            yield flush()
+
+            spool.close()
+            export_cache.store_artifact(spool.name, "class_csv", class_id, key, "csv")
+            stored = True
+        finally:
+            stream_db.close()
+            if not stored:
+                spool.close()
+                export_cache.discard_artifact(spool.name)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename=class_{class_id}_report.csv",
+            "ETag": f'"{key}"'
+        }
+    )
+
 @export_bp.route("/api/export/class/<int:class_id>/xlsx", methods=["GET"])
 def export_class_as_xlsx(class_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
-        result = export_crud.generate_class_report_data(db, class_id)
-        if result is None:
+        if class_crud.get_class(db, class_id=class_id) is None:
              return jsonify({"detail": "Class not found or has no students"}), 404
-            
-        data, columns = result
-
-        stream = io.BytesIO()
-        workbook = xlsxwriter.Workbook(stream, {'in_memory': True})
-        worksheet = workbook.add_worksheet('Students')
-        
-        # Write Header
-        for col_num, col_name in enumerate(columns):
-            worksheet.write(0, col_num, col_name)
-            
-        # Write Data
-        for row_num, row_data in enumerate(data, start=1):
-            for col_num, col_name in enumerate(columns):
-                worksheet.write(row_num, col_num, row_data.get(col_name, ""))
-                
-        workbook.close()
-        stream.seek(0)
-        
-        return send_file(
-            stream,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=f"class_{class_id}_report.xlsx"
+
+        key = export_cache.artifact_key("class_xlsx", class_id, export_crud.get_class_data_version(db, class_id))
+        path = export_cache.get_artifact("class_xlsx", class_id, key, "xlsx")
+        if path is None:
+            # The workbook is spooled to a file in the cache directory and
+            # streamed from there once it is complete.
+            spool = export_cache.open_artifact_spool()
+            try:
+                export_crud.write_class_report_xlsx(db, class_id, spool)
+                spool.close()
+            except Exception:
+                spool.close()
+                export_cache.discard_artifact(spool.name)
+                raise
+            path = export_cache.store_artifact(spool.name, "class_xlsx", class_id, key, "xlsx")
+
+        return _send_artifact(
+            path, key,
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            f"class_{class_id}_report.xlsx"
         )
     finally:
         db.close()
@@ -72,18 +132,54 @@ def export_class_as_xlsx(class_id):
 
 @export_bp.route("/api/export/student/<int:student_id>/pdf", methods=["GET"])
 def export_student_as_pdf(student_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
-        pdf_buffer = export_crud.generate_student_pdf_report(db, student_id)
-        if pdf_buffer is None:
+        student = student_crud.get_student_by_id(db, student_id=student_id)
+        if student is None:
              return jsonify({"detail": "Student not found"}), 404
 
-        pdf_buffer.seek(0)
-        return send_file(
-            pdf_buffer,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=f"student_{student_id}_report.pdf"
-        )
+        key = export_cache.artifact_key("student_pdf", student_id, export_crud.get_student_data_version(db, student))
+        path = export_cache.get_artifact("student_pdf", student_id, key, "pdf")
+        if path is None:
+            pdf_bytes = export_crud.render_student_pdf(export_crud.student_report_data(student))
+            with export_cache.open_artifact_spool() as spool:
+                spool.write(pdf_bytes)
+            path = export_cache.store_artifact(spool.name, "student_pdf", student_id, key, "pdf")
+
+        return _send_artifact(path, key, 'application/pdf', f"student_{student_id}_report.pdf")
     finally:
         db.close()
+
+@export_bp.route("/api/export/class/<int:class_id>/pdf.zip", methods=["GET"])
+def export_class_as_pdf_zip(class_id):
+    db = get_read_db()
+    try:
+        reports = export_crud.get_class_pdf_report_data(db, class_id)
+        if reports is None:
+             return jsonify({"detail": "Class not found"}), 404
+    finally:
+        db.close()
+
+    logger = current_app.logger
+
+    # Each PDF is added to the archive as soon as its worker finishes.
+    def generate():
+        started = time.perf_counter()
+        sink = _ZipChunkStream()
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for filename, pdf_bytes in export_crud.iter_rendered_student_pdfs(reports):
+                archive.writestr(filename, pdf_bytes)
+                yield sink.drain()
+        yield sink.drain()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Rendered %d student reports for class %d in %.2fs (%.1f students/s)",
+            len(reports), class_id, elapsed, len(reports) / elapsed if elapsed else 0.0
+        )
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=class_{class_id}_reports.zip"}
+    )
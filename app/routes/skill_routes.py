@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
 from app.database import SessionLocal
-from app.schemas.skill_schema import SkillUpdate
+from app.schemas.skill_schema import SkillUpdate, SkillBatchUpdate
 from app.crud import skill_crud
+from app.serializers import serialize_skill
 
 skill_bp = Blueprint('skills', __name__)
 
@@ -20,13 +21,44 @@ def update_skill_for_student(student_id, skill_name):
         if updated_skill is None:
              return jsonify({"detail": "Student or Skill not found"}), 404
         
-        # Serialize simply
+        return jsonify(serialize_skill(updated_skill))
+    finally:
+        db.close()
+
+@skill_bp.route("/api/students/skills/batch", methods=["PUT"])
+def update_skills_batch():
+    db = SessionLocal()
+    try:
+        data = request.get_json()
+        try:
+            batch = SkillBatchUpdate(**data)
+        except ValidationError as e:
+             return jsonify({"detail": e.errors()}), 422
+
+        # All items are applied in a single transaction; items whose student
+        # or skill does not exist are reported and skipped.
+        updated_skills = skill_crud.update_student_skills_batch(db=db, updates=batch.updates)
+
+        results = []
+        for item, skill in zip(batch.updates, updated_skills):
+            if skill is None:
+                results.append({
+                    "student_id": item.student_id,
+                    "skill_name": item.skill_name,
+                    "status": "not_found",
+                    "detail": "Student or Skill not found"
+                })
+                continue
+            results.append({
+                "student_id": item.student_id,
+                "skill_name": item.skill_name,
+                "status": "updated",
+                "skill": serialize_skill(skill)
+            })
+
         return jsonify({
-            "id": updated_skill.id,
-            "name": updated_skill.name,
-            "current_status": updated_skill.current_status.value if hasattr(updated_skill.current_status, 'value') else updated_skill.current_status,
-            "score": updated_skill.score,
-            "last_updated": updated_skill.last_updated
+            "updated": sum(1 for skill in updated_skills if skill is not None),
+            "results": results
         })
     finally:
         db.close()
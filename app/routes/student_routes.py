@@ -1,45 +1,82 @@
 from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
 from app.database import SessionLocal
+from app.read_routing import get_read_db
 from app.schemas.student_schema import StudentPromote
 from app.crud import student_crud, class_crud
+from app import response_cache, pagination, field_selection
+from app.serializers import serialize_student, serialize_milestone
+from datetime import datetime, timezone
 
 student_bp = Blueprint('students', __name__)
 
+# read_student embeds only this many recent milestones by default; the full
+# history is paged through /api/students/<id>/milestones
+RECENT_MILESTONES = 20
+STUDENT_INCLUDES = ("skills", "milestones", "enrolled_class")
+MILESTONE_PAGE_SIZE = 50
+MAX_MILESTONE_PAGE_SIZE = 500
+
+# ISO 8601 date or datetime; aware values are converted to naive UTC like the stored timestamps
+def _parse_datetime(value: str):
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 @student_bp.route("/api/students/<int:student_id>", methods=["GET"])
+@response_cache.cached_response(response_cache.by_student_id)
 def read_student(student_id):
-    db = SessionLocal()
+    db = get_read_db()
     try:
-        db_student = student_crud.get_student_by_id(db, student_id=student_id)
+        # ?fields= and ?include= trim the response; everything is returned by default
+        try:
+            fields = field_selection.parse_fields(request.args, student_crud.STUDENT_FIELDS)
+            include = field_selection.parse_include(request.args, STUDENT_INCLUDES, default=STUDENT_INCLUDES)
+        except field_selection.InvalidSelection as e:
+            return jsonify({"detail": str(e)}), 422
+
+        options = student_crud.student_load_options(fields, skills="skills" in include, enrolled_class="enrolled_class" in include)
+        db_student = student_crud.get_student_by_id(db, student_id=student_id, options=options)
         if db_student is None:
              return jsonify({"detail": "Student not found"}), 404
         
-        # Manually serialize nested student data including skills and milestones
+        milestones = None
+        if "milestones" in include:
+            recent_milestones = request.args.get('recent_milestones', RECENT_MILESTONES, type=int)
+            milestones = student_crud.get_recent_milestones_by_student(db, [student_id], recent_milestones)[student_id]
+        enrolled_class = db_student.enrolled_class if "enrolled_class" in include else None
+
         # This mirrors the Pydantic schema structure
-        student_dict = {
-            "id": db_student.id,
-            "name": db_student.name, # Assuming name is a property or composite of first/last
-            "enrollment_date": db_student.enrollment_date,
-            "is_archived": db_student.is_archived,
-            "enrolled_class": {
-                "id": db_student.enrolled_class.id,
-                "name": db_student.enrolled_class.name
-            } if db_student.enrolled_class else None,
-            "skills": [{
-                "id": s.id,
-                "name": s.name,
-                "current_status": s.current_status.value if hasattr(s.current_status, 'value') else s.current_status,
-                "score": s.score,
-                "last_updated": s.last_updated
-            } for s in db_student.skills],
-            "milestones": [{
-                "id": m.id,
-                "skill_name": m.skill_name,
-                "new_status": m.new_status.value if hasattr(m.new_status, 'value') else m.new_status,
-                "timestamp": m.timestamp
-            } for m in db_student.milestones]
-        }
-        return jsonify(student_dict)
+        return jsonify(serialize_student(db_student, fields, include, milestones=milestones, enrolled_class=enrolled_class))
+    finally:
+        db.close()
+
+@student_bp.route("/api/students/<int:student_id>/milestones", methods=["GET"])
+@response_cache.cached_response(response_cache.by_student_id)
+def read_student_milestones(student_id):
+    db = get_read_db()
+    try:
+        if student_crud.get_student_by_id(db, student_id=student_id) is None:
+            return jsonify({"detail": "Student not found"}), 404
+
+        limit = max(1, min(request.args.get('limit', MILESTONE_PAGE_SIZE, type=int), MAX_MILESTONE_PAGE_SIZE))
+        cursor = request.args.get('cursor')
+        try:
+            since = _parse_datetime(request.args['since']) if 'since' in request.args else None
+            until = _parse_datetime(request.args['until']) if 'until' in request.args else None
+        except ValueError:
+            return jsonify({"detail": "since/until must be ISO 8601 dates or datetimes"}), 422
+        # Newest first; follow X-Next-Cursor for older pages
+        try:
+            before = pagination.decode_cursor(cursor, (int,))[0] if cursor else None
+            milestones, next_key = student_crud.get_student_milestones(
+                db, student_id, since=since, until=until, skill_name=request.args.get('skill'), before=before, limit=limit
+            )
+        except pagination.InvalidCursor:
+            return jsonify({"detail": "Invalid cursor"}), 422
+        response = jsonify([serialize_milestone(m) for m in milestones])
+        return pagination.with_next_cursor(response, [next_key] if next_key is not None else None)
     finally:
         db.close()
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List
+from typing import List, Dict
 from .student_schema import Student
 
 class ClassBase(BaseModel):
@@ -8,6 +8,12 @@ class ClassBase(BaseModel):
 class ClassCreate(ClassBase):
     pass
 
+class ClassRollover(BaseModel):
+    # source class id -> target class id
+    mapping: Dict[int, int]
+    include_archived: bool = False
+    dry_run: bool = False
+
 class Class(ClassBase):
     id: int
     students: List[Student] = []
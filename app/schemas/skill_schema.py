@@ -1,4 +1,5 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Annotated
 from datetime import datetime
 from app.models.school_models import SkillStatus
 
@@ -17,4 +18,11 @@ class SkillUpdate(BaseModel):
     new_status: SkillStatus | None = None
     score: int | None = None
     comment: str | None = None
-    progress_value: str | None = None
\ No newline at end of file
+    progress_value: str | None = None
+
+class SkillBatchItem(SkillUpdate):
+    student_id: int
+    skill_name: str
+
+class SkillBatchUpdate(BaseModel):
+    updates: Annotated[List[SkillBatchItem], Field(min_length=1, max_length=1000)]
\ No newline at end of file
@@ -0,0 +1,38 @@
+# --- Shared Response Serializers ---
+# Plain dicts for the ORM rows the routes return. Values are passed through
+# as-is: enums, dates and datetimes are encoded by app.json_provider.
+# Each serializer is compiled once from a dict literal over its columns,
+# which benchmarks/roster_serialization.py shows is several times faster per
+# row than zipping an attrgetter's tuple into a dict.
+
+def _serializer(*columns):
+    # Column names are the constants below, never request input
+    return eval("lambda obj: {" + ", ".join(f"{column!r}: obj.{column}" for column in columns) + "}")
+
+SKILL_COLUMNS = ("id", "name", "current_status", "score", "last_updated")
+# Milestones embedded in student / roster responses
+MILESTONE_SUMMARY_COLUMNS = ("id", "skill_name", "new_status", "timestamp")
+# Milestones from the history endpoint
+MILESTONE_COLUMNS = ("id", "skill_name", "previous_status", "new_status", "comment", "progress_value", "narrative", "timestamp")
+
+serialize_skill = _serializer(*SKILL_COLUMNS)
+serialize_milestone_summary = _serializer(*MILESTONE_SUMMARY_COLUMNS)
+serialize_milestone = _serializer(*MILESTONE_COLUMNS)
+
+def serialize_class_ref(db_class):
+    return {"id": db_class.id, "name": db_class.name} if db_class is not None else None
+
+# A student with the selected scalar `fields` (id is always present) and the
+# relationships named in `include`. Milestones and the class are passed in
+# because callers load them differently (windowed query, one class per roster).
+def serialize_student(student, fields, include=(), milestones=None, enrolled_class=None):
+    result = {"id": student.id}
+    for field in fields:
+        result[field] = getattr(student, field)
+    if "enrolled_class" in include:
+        result["enrolled_class"] = serialize_class_ref(enrolled_class)
+    if "skills" in include:
+        result["skills"] = [serialize_skill(skill) for skill in student.skills]
+    if "milestones" in include:
+        result["milestones"] = [serialize_milestone_summary(m) for m in milestones]
+    return result
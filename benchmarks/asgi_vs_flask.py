@@ -0,0 +1,178 @@
+"""Requests/second and latency of the ASGI entry point against the Flask app.
+
+    python benchmarks/asgi_vs_flask.py [--students 300] [--concurrency 32] [--duration 10]
+
+Seeds a scratch SQLite database (one class, four skills per student, a
+couple of months of milestones), then serves it twice:
+
+- flask: app.main:app on Werkzeug's threaded server (what `flask run` uses)
+- asgi:  app.asgi:app on uvicorn, where the analytics endpoints reach the
+         same Flask views through the WSGI mount
+
+app.asgi only serves login and the student PDF natively, so this measures
+what the ASGI shim adds in front of the Flask views, not an async read path.
+Each server gets the same closed-loop load: `concurrency` clients cycling
+through the analytics endpoints for `duration` seconds after a short warm-up.
+The response cache is disabled (RESPONSE_CACHE_MAX_ENTRIES=0) so both sides
+do the same work on every request.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATUSES = ["Red", "Yellow", "Green", "Gold"]
+SKILLS = ["Listening", "Reading", "Speaking", "Writing"]
+
+SERVERS = {
+    # HTTP/1.1 so the client can keep connections alive, as it does with uvicorn
+    "flask": [sys.executable, "-c",
+              "import logging, sys; from werkzeug.serving import WSGIRequestHandler, run_simple; from app.main import app; "
+              "logging.getLogger('werkzeug').setLevel(logging.ERROR); WSGIRequestHandler.protocol_version = 'HTTP/1.1'; "
+              "run_simple('127.0.0.1', int(sys.argv[1]), app, threaded=True)"],
+    "asgi": [sys.executable, "-m", "uvicorn", "app.asgi:app", "--host", "127.0.0.1", "--log-level", "warning", "--port"],
+}
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def seed(students: int, milestones_per_student: int):
+    # Runs in this process with DATABASE_URL already pointing at the scratch file
+    from sqlalchemy import insert
+    from app.database import Base, SessionLocal, engine
+    from app.models.user_model import User
+    from app.models.email_model import OutboundEmail  # noqa: F401
+    from app.models.cache_model import ResponseCacheVersion  # noqa: F401
+    from app.models.school_models import Class, Student, Skill, Milestone
+    from app.crud import summary_crud
+    from app.passwords import pwd_context
+    from app.routes.auth_routes import create_access_token
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(students)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.add(User(email="bench@example.com", hashed_password=pwd_context.hash("bench")))
+        db.execute(insert(Class), [{"id": 1, "name": "Benchmark"}])
+        db.execute(insert(Student), [
+            {"id": i, "name": f"Student {i}", "class_id": 1, "enrollment_date": date.today(), "is_archived": False}
+            for i in range(1, students + 1)
+        ])
+        db.execute(insert(Skill), [
+            {"student_id": i, "name": skill, "current_status": rng.choice(STATUSES), "score": 0}
+            for i in range(1, students + 1) for skill in SKILLS
+        ])
+        db.execute(insert(Milestone), [
+            {"student_id": i, "skill_name": rng.choice(SKILLS), "previous_status": rng.choice(STATUSES),
+             "new_status": rng.choice(STATUSES), "timestamp": now - timedelta(days=rng.uniform(0, 60))}
+            for i in range(1, students + 1) for _ in range(milestones_per_student)
+        ])
+        db.commit()
+        summary_crud.rebuild_summary(db)
+    finally:
+        db.close()
+    return create_access_token({"sub": "bench@example.com"}, timedelta(hours=1))
+
+def _wait_until_up(base_url: str, process, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+async def _load(base_url: str, token: str, paths: list, concurrency: int, seconds: float):
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=60) as client:
+        deadline = time.monotonic() + seconds
+
+        async def worker(offset: int):
+            nonlocal errors
+            position = offset
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[position % len(paths)])
+                    ok = response.status_code == 200
+                except httpx.TransportError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+                position += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return latencies, errors, elapsed
+
+def _percentile(values: list, fraction: float):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--milestones", type=int, default=10, help="milestones per student")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=["flask", "asgi"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(
+            os.environ,
+            PYTHONPATH=ROOT,
+            DATABASE_URL=f"sqlite:///{tmpdir}/bench.db",
+            EXPORT_CACHE_DIR=os.path.join(tmpdir, "exports"),
+            RESPONSE_CACHE_MAX_ENTRIES="0",
+        )
+        env.setdefault("SECRET_KEY", "benchmark-secret")
+        env.setdefault("ALGORITHM", "HS256")
+        env.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+        os.environ.update(env)
+        sys.path.insert(0, ROOT)
+        token = seed(args.students, args.milestones)
+
+        paths = [
+            "/api/analytics/class/1/dashboard",
+            "/api/analytics/class/1/trends?bucket=week",
+            "/api/analytics/class/1/by-skill",
+            "/api/analytics/class/1/weighted-distribution",
+            "/api/analytics/student/1/comparison",
+        ]
+        print(f"{args.students} students, {args.concurrency} concurrent clients, {args.duration:.0f}s per server")
+        print(f"{'server':>6} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for name in args.servers:
+            port = _free_port()
+            process = subprocess.Popen(SERVERS[name] + [str(port)], env=env, cwd=ROOT)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                _wait_until_up(base_url, process)
+                asyncio.run(_load(base_url, token, paths, args.concurrency, args.warmup))
+                latencies, errors, elapsed = asyncio.run(_load(base_url, token, paths, args.concurrency, args.duration))
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+            print(f"{name:>6} {len(latencies):>9} {errors:>7} {len(latencies) / elapsed:>8.1f} "
+                  f"{_percentile(latencies, 0.50) * 1000:>8.1f} {_percentile(latencies, 0.99) * 1000:>8.1f}")
+
+if __name__ == "__main__":
+    main()
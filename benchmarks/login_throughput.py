@@ -0,0 +1,165 @@
+"""Login throughput and 503 rate, before and after the password pool.
+
+    python benchmarks/login_throughput.py [--concurrency 1 4 16 64] [--duration 10] [--rounds 12]
+
+Seeds a scratch SQLite database with one user, then serves app.main:app on
+Werkzeug's threaded server twice:
+
+- before: bcrypt verified inline on the request thread, as the original
+  login route did (passwords.verify_password swapped for the bare
+  verify_and_update)
+- after:  the login route as shipped, bcrypt on the bounded password pool
+
+At each concurrency level that many clients POST /token in a closed loop for
+`duration` seconds, waiting out Retry-After after a 503. A separate client polls GET /api/classes/ meanwhile, so
+the table also shows what a login storm does to every other endpoint.
+503 is the queue-full answer (PASSWORD_HASH_MAX_PENDING); it only exists
+in the after mode.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark-password"
+
+_SERVE = (
+    "import logging, sys; from werkzeug.serving import WSGIRequestHandler, run_simple; from app.main import app; "
+    "logging.getLogger('werkzeug').setLevel(logging.ERROR); WSGIRequestHandler.protocol_version = 'HTTP/1.1'; "
+    "run_simple('127.0.0.1', int(sys.argv[1]), app, threaded=True)"
+)
+MODES = {
+    "before": [sys.executable, "-c", "from app import passwords; passwords.verify_password = passwords._verify; " + _SERVE],
+    "after": [sys.executable, "-c", _SERVE],
+}
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def seed():
+    # Runs in this process with DATABASE_URL already pointing at the scratch file
+    from app.database import Base, SessionLocal, engine
+    from app.models.user_model import User
+    from app.models.email_model import OutboundEmail  # noqa: F401
+    from app.models.cache_model import ResponseCacheVersion  # noqa: F401
+    from app.models.school_models import Class
+    from app.passwords import pwd_context
+    from app.routes.auth_routes import create_access_token
+    from datetime import timedelta
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add(User(email=EMAIL, hashed_password=pwd_context.hash(PASSWORD)))
+        db.add(Class(name="Benchmark"))
+        db.commit()
+    finally:
+        db.close()
+    return create_access_token({"sub": EMAIL}, timedelta(hours=1))
+
+def _wait_until_up(base_url: str, process, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+def _percentile(values: list, fraction: float):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+async def _load(base_url: str, token: str, concurrency: int, seconds: float):
+    statuses, probe_latencies = [], []
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        deadline = time.monotonic() + seconds
+
+        async def login():
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.post("/token", json={"username": EMAIL, "password": PASSWORD})
+                except httpx.TransportError:
+                    statuses.append(None)
+                    continue
+                statuses.append(response.status_code)
+                if response.status_code == 503:
+                    # Back off as told, like the frontend does
+                    await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+        async def probe():
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    await client.get("/api/classes/", headers={"Authorization": f"Bearer {token}"})
+                except httpx.TransportError:
+                    pass
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        started = time.monotonic()
+        await asyncio.gather(probe(), *(login() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return statuses, probe_latencies, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["before", "after"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(
+            os.environ,
+            PYTHONPATH=ROOT,
+            DATABASE_URL=f"sqlite:///{tmpdir}/bench.db",
+            EXPORT_CACHE_DIR=os.path.join(tmpdir, "exports"),
+            BCRYPT_ROUNDS=str(args.rounds),
+            RESPONSE_CACHE_MAX_ENTRIES="0",
+        )
+        env.setdefault("SECRET_KEY", "benchmark-secret")
+        env.setdefault("ALGORITHM", "HS256")
+        env.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+        os.environ.update(env)
+        sys.path.insert(0, ROOT)
+        token = seed()
+
+        print(f"bcrypt cost {args.rounds}, {os.cpu_count()} CPUs, {args.duration:.0f}s per level")
+        print(f"{'mode':>6} {'clients':>7} {'logins':>7} {'logins/s':>9} {'503 %':>6} {'errors':>7} {'other p99 ms':>13}")
+        for mode in args.modes:
+            port = _free_port()
+            # Own process group, so stopping the server also stops its password pool workers
+            process = subprocess.Popen(MODES[mode] + [str(port)], env=env, cwd=ROOT, start_new_session=True)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                _wait_until_up(base_url, process)
+                for concurrency in args.concurrency:
+                    statuses, probe_latencies, elapsed = asyncio.run(_load(base_url, token, concurrency, args.duration))
+                    logins = statuses.count(200)
+                    busy = statuses.count(503)
+                    errors = len(statuses) - logins - busy
+                    print(f"{mode:>6} {concurrency:>7} {logins:>7} {logins / elapsed:>9.1f} "
+                          f"{100 * busy / max(len(statuses), 1):>6.1f} {errors:>7} {_percentile(probe_latencies, 0.99) * 1000:>13.1f}")
+            finally:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
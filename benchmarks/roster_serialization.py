@@ -0,0 +1,148 @@
+"""Roster serialization time: hand-built dicts vs the shared serializers.
+
+    python benchmarks/roster_serialization.py [--students 1000] [--milestones 5] [--runs 20]
+
+Seeds a scratch SQLite database with one class of N students (four skills
+and a few milestones each), loads the roster once the way
+read_class_students does, then times turning those ORM rows into a JSON
+response body:
+
+- before:  the original route's hand-built dicts (the
+           `x.value if hasattr(x, 'value')` enum checks) encoded by Flask's
+           DefaultJSONProvider
+- orjson:  app.serializers.serialize_student encoded by FastJSONProvider
+- stdlib:  the same serializers through FastJSONProvider's stdlib fallback,
+           i.e. without orjson installed
+
+"build" is the dict construction, "encode" the provider's response(); both
+are the best of `runs` runs, so the query time is not part of the numbers.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATUSES = ["Red", "Yellow", "Green", "Gold"]
+SKILLS = ["Listening", "Reading", "Speaking", "Writing"]
+
+def seed(students: int, milestones_per_student: int):
+    # Runs in this process with DATABASE_URL already pointing at the scratch file
+    from sqlalchemy import insert
+    from app.database import Base, SessionLocal, engine
+    from app.models.school_models import Class, Student, Skill, Milestone
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(students)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.execute(insert(Class), [{"id": 1, "name": "Benchmark"}])
+        db.execute(insert(Student), [
+            {"id": i, "name": f"Student {i}", "class_id": 1, "enrollment_date": date.today(), "is_archived": False}
+            for i in range(1, students + 1)
+        ])
+        db.execute(insert(Skill), [
+            {"student_id": i, "name": skill, "current_status": rng.choice(STATUSES), "score": 0, "last_updated": now}
+            for i in range(1, students + 1) for skill in SKILLS
+        ])
+        db.execute(insert(Milestone), [
+            {"student_id": i, "skill_name": rng.choice(SKILLS), "previous_status": rng.choice(STATUSES),
+             "new_status": rng.choice(STATUSES), "timestamp": now - timedelta(days=rng.uniform(0, 60))}
+            for i in range(1, students + 1) for _ in range(milestones_per_student)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def build_before(students, fields):
+    # The roster body as read_class_students built it before app.serializers
+    result = []
+    for s in students:
+        student_dict = {"id": s.id}
+        for field in fields:
+            student_dict[field] = getattr(s, field)
+        student_dict["skills"] = [{
+            "id": skill.id,
+            "name": skill.name,
+            "current_status": skill.current_status.value if hasattr(skill.current_status, 'value') else skill.current_status,
+            "score": skill.score,
+            "last_updated": skill.last_updated
+        } for skill in s.skills]
+        student_dict["milestones"] = [{
+            "id": m.id,
+            "skill_name": m.skill_name,
+            "new_status": m.new_status.value if hasattr(m.new_status, 'value') else m.new_status,
+            "timestamp": m.timestamp
+        } for m in s.milestones]
+        result.append(student_dict)
+    return result
+
+def build_after(students, fields):
+    from app.serializers import serialize_student
+    include = ("skills", "milestones")
+    return [serialize_student(s, fields, include, milestones=s.milestones) for s in students]
+
+def _time(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--milestones", type=int, default=5, help="milestones per student")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/bench.db"
+        os.environ["EXPORT_CACHE_DIR"] = os.path.join(tmpdir, "exports")
+        os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+        os.environ.setdefault("ALGORITHM", "HS256")
+        os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+        sys.path.insert(0, ROOT)
+        seed(args.students, args.milestones)
+
+        from flask.json.provider import DefaultJSONProvider
+        from app import json_provider
+        from app.crud import student_crud
+        from app.database import SessionLocal
+        from app.main import app
+
+        db = SessionLocal()
+        try:
+            fields = ["name", "is_archived"]
+            students = student_crud.get_students_by_class_id(db, class_id=1, limit=args.students, fields=fields)
+            if json_provider.orjson is None:
+                print("orjson is not installed; the orjson row uses the stdlib fallback too")
+
+            providers = {
+                "before": (DefaultJSONProvider(app), build_before),
+                "orjson": (json_provider.FastJSONProvider(app), build_after),
+                "stdlib": (json_provider.FastJSONProvider(app), build_after),
+            }
+            print(f"{args.students} students, 4 skills and {args.milestones} milestones each, best of {args.runs} runs")
+            print(f"{'mode':>7} {'build ms':>9} {'encode ms':>10} {'total ms':>9} {'median ms':>10} {'KiB':>7}")
+            orjson = json_provider.orjson
+            with app.app_context():
+                for mode, (provider, build) in providers.items():
+                    json_provider.orjson = None if mode == "stdlib" else orjson
+                    build_best, build_median, body = _time(lambda: build(students, fields), args.runs)
+                    encode_best, encode_median, response = _time(lambda: provider.response(body), args.runs)
+                    size = len(response.get_data())
+                    print(f"{mode:>7} {build_best * 1000:>9.1f} {encode_best * 1000:>10.1f} {(build_best + encode_best) * 1000:>9.1f} "
+                          f"{(build_median + encode_median) * 1000:>10.1f} {size / 1024:>7.0f}")
+            json_provider.orjson = orjson
+        finally:
+            db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Peak RSS of the class XLSX export, before and after constant_memory.
+
+    python benchmarks/xlsx_export_rss.py [--rows 10000 100000]
+
+Seeds a scratch SQLite database with one class of N students (four skills
+each), then runs every export in a fresh subprocess so ru_maxrss measures
+that export alone:
+
+- before: the original route, the report rows built as a list of dicts
+  (legacy_report_data below) plus an in_memory workbook written cell by
+  cell and copied out with getvalue()
+- after:  export_crud.write_class_report_xlsx() in constant_memory mode,
+  spooled to a temporary file
+
+SQLite's memory-mapped I/O is turned off (SQLITE_MMAP_SIZE=0) unless set in
+the environment: mapped database pages count towards RSS and would hide
+what the export itself holds.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATUSES = ["Red", "Yellow", "Green", "Gold"]
+SKILLS = ["Listening", "Reading", "Speaking", "Writing"]
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def seed(path: str, rows: int):
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from sqlalchemy import insert
+    from app.database import Base, SessionLocal, engine
+    from app.models.school_models import Class, Student, Skill
+    from datetime import date
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.execute(insert(Class), [{"id": 1, "name": "Benchmark"}])
+        db.execute(insert(Student), [
+            {"id": i, "name": f"Student {i:06d}", "class_id": 1, "enrollment_date": date.today(), "is_archived": False}
+            for i in range(1, rows + 1)
+        ])
+        rng = random.Random(rows)
+        db.execute(insert(Skill), [
+            {"student_id": i, "name": skill, "current_status": rng.choice(STATUSES), "score": 0}
+            for i in range(1, rows + 1) for skill in SKILLS
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def legacy_report_data(db, class_id: int):
+    # export_crud.generate_class_report_data as the original route called it
+    from app.crud import class_crud
+
+    db_class = class_crud.get_class(db, class_id=class_id)
+    ordered_columns = ["Student Name", "Listening", "Reading", "Speaking", "Writing"]
+    data = []
+    for student in db_class.students:
+        skills_map = {skill.name: skill.current_status.value for skill in student.skills}
+        row = {"Student Name": student.name}
+        for col in ordered_columns[1:]:
+            row[col] = skills_map.get(col, "")
+        data.append(row)
+    return data, ordered_columns
+
+def run_export(mode: str, path: str):
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    import xlsxwriter
+    from app.database import SessionLocal
+    from app.crud import export_crud
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if mode == "before":
+            data, columns = legacy_report_data(db, 1)
+            stream = io.BytesIO()
+            workbook = xlsxwriter.Workbook(stream, {"in_memory": True})
+            worksheet = workbook.add_worksheet("Students")
+            for col_num, col_name in enumerate(columns):
+                worksheet.write(0, col_num, col_name)
+            for row_num, row_data in enumerate(data, start=1):
+                for col_num, col_name in enumerate(columns):
+                    worksheet.write(row_num, col_num, row_data.get(col_name, ""))
+            workbook.close()
+            size = len(stream.getvalue())
+        else:
+            with tempfile.TemporaryFile() as spool:
+                export_crud.write_class_report_xlsx(db, 1, spool)
+                size = spool.tell()
+    finally:
+        db.close()
+    print(json.dumps({
+        "seconds": time.perf_counter() - started,
+        "baseline_mb": baseline,
+        "peak_mb": _peak_rss_mb(),
+        "size_mb": size / (1024 * 1024),
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DB"), help=argparse.SUPPRESS)
+    parser.add_argument("--seed", nargs=2, metavar=("DB", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        return seed(args.seed[0], int(args.seed[1]))
+    if args.child:
+        return run_export(*args.child)
+
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.setdefault("SQLITE_MMAP_SIZE", "0")
+    print(f"{'rows':>8} {'mode':>7} {'seconds':>8} {'peak RSS MB':>12} {'over baseline':>14} {'file MB':>8}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for rows in args.rows:
+            path = os.path.join(tmpdir, f"bench_{rows}.db")
+            subprocess.run([sys.executable, __file__, "--seed", path, str(rows)], env=env, check=True)
+            for mode in ("before", "after"):
+                output = subprocess.run([sys.executable, __file__, "--child", mode, path], env=env, check=True, capture_output=True, text=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{rows:>8} {mode:>7} {result['seconds']:>8.2f} {result['peak_mb']:>12.1f} "
+                      f"{result['peak_mb'] - result['baseline_mb']:>14.1f} {result['size_mb']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from app.database import engine, Base
 from app.models.user_model import User
 from app.models.school_models import Class, Student, Skill, Milestone
+from app.models.email_model import OutboundEmail
+from app.models.cache_model import ResponseCacheVersion
 
 print("Creating all database tables...")
 Base.metadata.create_all(bind=engine)
@@ -0,0 +1,68 @@
+import os
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+# The app reads its configuration at import time, so point it at a scratch
+# SQLite database before anything under app/ is imported.
+_tmpdir = tempfile.mkdtemp(prefix="school-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/test.db"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["EXPORT_CACHE_DIR"] = os.path.join(_tmpdir, "exports")
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.user_model import User  # noqa: E402
+from app.models.email_model import OutboundEmail  # noqa: E402,F401
+from app.models.cache_model import ResponseCacheVersion  # noqa: E402,F401
+from app.models.school_models import Class, Student, Skill, SkillStatus  # noqa: E402
+from app import auth, response_cache  # noqa: E402
+
+SKILL_NAMES = ["Listening", "Reading", "Speaking", "Writing"]
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        SessionLocal.remove()
+        Base.metadata.drop_all(bind=engine)
+        response_cache.clear()
+        auth.clear()
+
+@pytest.fixture
+def client(db):
+    from app.main import app
+    from app.passwords import pwd_context
+    from app.routes.auth_routes import create_access_token
+
+    db.add(User(email="teacher@example.com", hashed_password=pwd_context.hash("secret")))
+    db.commit()
+    test_client = app.test_client()
+    token = create_access_token({"sub": "teacher@example.com"}, timedelta(minutes=30))
+    test_client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return test_client
+
+# Builds a class whose students each have the four skills: make_class(name,
+# statuses) with statuses[i] as student i's statuses, None for no skill rows
+@pytest.fixture
+def make_class(db):
+    def build(name: str, statuses: list):
+        db_class = Class(name=name)
+        db.add(db_class)
+        db.flush()
+        for position, student_statuses in enumerate(statuses):
+            student = Student(name=f"{name} student {position}", class_id=db_class.id, enrollment_date=date.today(), is_archived=False)
+            if student_statuses is not None:
+                student.skills = [Skill(name=skill, current_status=SkillStatus(status)) for skill, status in zip(SKILL_NAMES, student_statuses)]
+            db.add(student)
+        db.commit()
+        return db_class
+    return build
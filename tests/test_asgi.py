@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud import summary_crud
+
+@pytest.fixture
+def asgi_client(client):
+    from app.asgi import app
+    with TestClient(app) as test_client:
+        test_client.headers["Authorization"] = client.environ_base["HTTP_AUTHORIZATION"]
+        yield test_client
+
+def test_login(asgi_client):
+    response = asgi_client.post("/token", headers={"Authorization": ""}, json={"username": "teacher@example.com", "password": "secret"})
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert asgi_client.post("/token", data={"username": "teacher@example.com", "password": "wrong"}).status_code == 401
+
+def test_analytics_match_flask(db, client, asgi_client, make_class):
+    db_class = make_class("Parity", [["Red", "Yellow", "Green", "Gold"], ["Gold", "Gold", "Green", "Red"], None])
+    summary_crud.rebuild_summary(db)
+    student_id = db_class.students[0].id
+    client.put(f"/api/students/{student_id}/skills/Reading", json={"new_status": "Gold"})
+
+    for url in [
+        f"/api/analytics/class/{db_class.id}/by-skill",
+        f"/api/analytics/class/{db_class.id}/weighted-distribution",
+        f"/api/analytics/class/{db_class.id}/trends",
+        f"/api/analytics/class/{db_class.id}/trends?bucket=day",
+        f"/api/analytics/class/{db_class.id}/dashboard",
+        f"/api/analytics/student/{student_id}/comparison",
+    ]:
+        native = asgi_client.get(url)
+        assert native.status_code == 200, url
+        assert native.content == client.get(url).data, url
+
+    assert asgi_client.get(f"/api/analytics/class/{db_class.id}/trends?bucket=year").status_code == 422
+    assert asgi_client.get("/api/analytics/class/999/dashboard").status_code == 404
+    assert asgi_client.get("/api/analytics/student/999/comparison").status_code == 404
+    assert asgi_client.get(f"/api/analytics/class/{db_class.id}/by-skill", headers={"Authorization": ""}).status_code == 401
+
+def test_analytics_share_the_response_cache(asgi_client, make_class):
+    class_id = make_class("Cached", [["Red", "Yellow", "Green", "Gold"]]).id
+    url = f"/api/analytics/class/{class_id}/by-skill"
+    first = asgi_client.get(url)
+    assert first.headers["X-Cache"] == "MISS"
+    second = asgi_client.get(url)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert asgi_client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+def test_student_pdf(asgi_client, make_class):
+    student_id = make_class("Pdf", [["Red", "Gold", "Green", "Yellow"]]).students[0].id
+    response = asgi_client.get(f"/api/export/student/{student_id}/pdf")
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    assert asgi_client.get(f"/api/export/student/{student_id}/pdf", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    assert asgi_client.get("/api/export/student/999/pdf").status_code == 404
+
+def test_concurrent_analytics_requests(client, make_class):
+    import httpx
+    from app.asgi import app
+
+    db_class = make_class("Busy", [["Red", "Yellow", "Green", "Gold"]] * 20)
+    headers = {"Authorization": client.environ_base["HTTP_AUTHORIZATION"]}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", headers=headers) as http:
+            return await asyncio.gather(*(http.get(f"/api/analytics/class/{db_class.id}/dashboard") for _ in range(40)))
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200] * 40
+    assert len({response.content for response in responses}) == 1
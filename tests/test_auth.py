@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+import pytest
+
+from app import auth
+from app.database import SessionLocal
+from app.models.user_model import User
+from app.routes.auth_routes import create_access_token
+
+@pytest.fixture
+def token(client):
+    token = create_access_token({"sub": "teacher@example.com"}, timedelta(minutes=30))
+    assert auth.authenticate_token(token) is not None
+    assert token in auth._principals
+    return token
+
+@pytest.fixture
+def writer():
+    # Separate from the thread-scoped session authenticate_token uses
+    session = SessionLocal.session_factory()
+    yield session
+    session.close()
+
+def _rename(session, email):
+    user = session.query(User).filter(User.email == "teacher@example.com").one()
+    user.email = email
+    session.flush()
+
+def test_commit_drops_cached_token(token, writer):
+    _rename(writer, "renamed@example.com")
+    writer.commit()
+    assert token not in auth._principals
+    assert auth.authenticate_token(token) is None
+
+def test_entry_cached_between_flush_and_commit_is_dropped(token, writer):
+    _rename(writer, "renamed@example.com")
+    # A concurrent request re-validates the token while the change is uncommitted
+    auth.clear()
+    assert auth.authenticate_token(token) is not None
+    writer.commit()
+    assert token not in auth._principals
+
+def test_rollback_keeps_cached_token(token, writer):
+    _rename(writer, "renamed@example.com")
+    writer.rollback()
+    assert token in auth._principals
+    writer.commit()
+    assert token in auth._principals
@@ -0,0 +1,42 @@
+import gc
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from app import database
+
+def test_discarded_engines_leave_the_fork_set(tmp_path):
+    app_engine = database.create_app_engine(f"sqlite:///{tmp_path / 'scratch.db'}")
+    assert app_engine in database._engines
+    count = len(database._engines)
+
+    app_engine.dispose()
+    del app_engine
+    gc.collect()
+    assert len(database._engines) == count - 1
+
+def test_only_pool_timeouts_count_as_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 0.01)
+    app_engine = database.create_app_engine(f"sqlite:///{tmp_path / 'scratch.db'}")
+    before = database.get_pool_stats()["timeouts"]
+
+    held = app_engine.connect()
+    try:
+        with pytest.raises(exc.TimeoutError):
+            app_engine.connect()
+    finally:
+        held.close()
+    assert database.get_pool_stats()["timeouts"] == before + 1
+
+    # A connection that fails to open is an error, not a timeout
+    app_engine.dispose()
+    def refuse(*args, **kwargs):
+        raise sqlite3.OperationalError("unable to open database file")
+    monkeypatch.setattr(app_engine.pool, "_creator", refuse)
+    with pytest.raises(exc.OperationalError):
+        app_engine.connect()
+    assert database.get_pool_stats()["timeouts"] == before + 1
+    app_engine.dispose()
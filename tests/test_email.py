@@ -0,0 +1,139 @@
+import socket
+import time
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+from app import email_utils
+from app.database import SessionLocal
+from app.models.email_model import OutboundEmail
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.refuse_data = 0  # answer this many DATA commands with a temporary failure
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("bounce@"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.refuse_data:
+            self.refuse_data -= 1
+            return "451 4.3.0 Try again later"
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    port = _free_port()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(email_utils, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(email_utils, "MAIL_PORT", port)
+    monkeypatch.setattr(email_utils, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(email_utils, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(email_utils, "MAIL_USERNAME", None)
+    monkeypatch.setattr(email_utils, "MAIL_FROM", "noreply@example.com")
+    yield handler
+    controller.stop()
+
+@pytest.fixture
+def worker(db, smtp_server, monkeypatch):
+    mail_worker = email_utils.MailWorker()
+    monkeypatch.setattr(email_utils, "get_mail_worker", lambda: mail_worker)
+    yield mail_worker
+    mail_worker.stop(timeout=5)
+
+def _wait_for(message_id: int, status: str, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    session = SessionLocal.session_factory()
+    try:
+        while True:
+            message = session.get(OutboundEmail, message_id)
+            if message.status == status or time.monotonic() > deadline:
+                return message
+            session.expire_all()
+            time.sleep(0.05)
+    finally:
+        session.close()
+
+def test_queued_email_is_delivered(db, worker, smtp_server):
+    message = email_utils.queue_email(db, "teacher@example.com", "Hello", "<p>Queued</p>")
+
+    delivered = _wait_for(message.id, "sent")
+    assert delivered.status == "sent"
+    assert delivered.attempts == 1
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.messages[0].rcpt_tos == ["teacher@example.com"]
+    assert b"Subject: Hello" in smtp_server.messages[0].original_content
+
+def test_temporary_failure_is_retried_with_backoff(db, worker, smtp_server, monkeypatch):
+    monkeypatch.setattr(email_utils, "MAIL_RETRY_BASE_SECONDS", 0.2)
+    smtp_server.refuse_data = 1
+    message = email_utils.queue_email(db, "teacher@example.com", "Retry", "body")
+
+    delivered = _wait_for(message.id, "sent")
+    assert delivered.status == "sent"
+    assert delivered.attempts == 2
+    assert delivered.last_error is None
+    assert len(smtp_server.messages) == 1
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(email_utils, "MAIL_RETRY_BASE_SECONDS", 30)
+    monkeypatch.setattr(email_utils, "MAIL_RETRY_MAX_SECONDS", 100)
+    assert [email_utils._retry_delay(attempts) for attempts in (1, 2, 3, 4)] == [30, 60, 100, 100]
+
+def test_refused_recipient_fails_permanently(db, worker, smtp_server):
+    message = email_utils.queue_email(db, "bounce@example.com", "Nope", "body")
+
+    failed = _wait_for(message.id, "failed")
+    assert failed.status == "failed"
+    assert failed.attempts == 1
+    assert "550" in failed.last_error
+    assert smtp_server.messages == []
+
+def test_pending_mail_starts_worker(db, worker, smtp_server, monkeypatch):
+    # Left in the queue by a previous process; nothing new is enqueued
+    message = OutboundEmail(recipient="teacher@example.com", subject="Left over", body="body", status="pending", attempts=0,
+                            next_attempt_at=email_utils.datetime.utcnow(), created_at=email_utils.datetime.utcnow())
+    db.add(message)
+    db.commit()
+    monkeypatch.setattr(email_utils, "_startup_checked_pid", None)
+
+    email_utils.start_worker_if_pending()
+    assert _wait_for(message.id, "sent").status == "sent"
+
+def test_each_delivery_is_committed_before_the_next(db, smtp_server, monkeypatch):
+    mail_worker = email_utils.MailWorker()
+    monkeypatch.setattr(email_utils, "get_mail_worker", lambda: mail_worker)
+    monkeypatch.setattr(mail_worker, "wake", lambda: None)
+    first = email_utils.queue_email(db, "one@example.com", "One", "body").id
+    second = email_utils.queue_email(db, "two@example.com", "Two", "body").id
+
+    class Crash(BaseException):
+        pass
+
+    send = mail_worker._send
+    def send_then_crash(message):
+        if message.recipient == "two@example.com":
+            raise Crash()
+        send(message)
+    monkeypatch.setattr(mail_worker, "_send", send_then_crash)
+
+    with pytest.raises(Crash):
+        mail_worker.drain()
+    mail_worker._close()
+
+    # The first message's outcome survived the crash; only the second is resent
+    assert _wait_for(first, "sent", timeout=0).status == "sent"
+    assert _wait_for(second, "sent", timeout=0).status == "pending"
@@ -0,0 +1,38 @@
+import io
+import zipfile
+
+from app import pdf_pool
+
+def test_class_pdf_zip_reuses_the_shared_pool(client, make_class):
+    db_class = make_class("Reports", [["Red", "Gold", "Green", "Yellow"], ["Gold", "Gold", "Gold", "Gold"], None])
+
+    pools = []
+    for _ in range(2):
+        response = client.get(f"/api/export/class/{db_class.id}/pdf.zip")
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+        assert len(archive.namelist()) == 3
+        assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+        pools.append(pdf_pool.get_pool())
+
+    assert pools[0] is pools[1]
+
+def test_class_pdf_zip_unknown_class(client):
+    assert client.get("/api/export/class/999/pdf.zip").status_code == 404
+
+def test_student_pdf_loads_the_student_once(db, client, make_class):
+    from sqlalchemy import event
+    from app.database import engine
+
+    student_id = make_class("Single", [["Red", "Gold", "Green", "Yellow"]]).students[0].id
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"/api/export/student/{student_id}/pdf")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+    assert len([s for s in statements if s.lstrip().startswith("SELECT") and "\nFROM students" in s]) == 1
@@ -0,0 +1,28 @@
+import io
+
+from app.models.school_models import Student
+
+def _upload(client, content: bytes, filename: str):
+    return client.post("/api/classes/import", data={"file": (io.BytesIO(content), filename)}, content_type="multipart/form-data")
+
+def test_import_csv(client, db):
+    response = _upload(client, "Student Name,Class\nZoë Adams,Year 7\nLiam Brown,Year 7\n".encode("utf-8-sig"), "roster.csv")
+    assert response.status_code == 200
+    assert response.json["created_students"] == 2
+    assert response.json["errors"] == []
+    assert {name for (name,) in db.query(Student.name)} == {"Zoë Adams", "Liam Brown"}
+
+def test_import_rejects_non_utf8_csv(client, db):
+    # What Excel's plain "CSV" option writes on Windows
+    content = "Student Name,Class\n" + "Plain Name,Year 7\n" * 600 + "Zoë Adams,Year 7\n"
+    response = _upload(client, content.encode("cp1252"), "roster.csv")
+    assert response.status_code == 422
+    assert "UTF-8" in response.json["detail"]
+    # Nothing from the readable part of the file was imported
+    assert db.query(Student).count() == 0
+
+def test_import_rejects_corrupt_xlsx(client, db):
+    response = _upload(client, b"Student Name,Class\nLiam Brown,Year 7\n", "renamed.xlsx")
+    assert response.status_code == 422
+    assert "xlsx" in response.json["detail"]
+    assert db.query(Student).count() == 0
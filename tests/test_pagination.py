@@ -0,0 +1,36 @@
+from app.models.school_models import Class
+
+def _follow(client, url):
+    items, cursor = [], None
+    for _ in range(100):
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        items.extend(response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return items
+    raise AssertionError("cursor never ran out")
+
+def test_roster_limit_zero_is_clamped(client, make_class):
+    db_class = make_class("Clamp", [["Red"] * 4] * 3)
+    student_ids = sorted(s.id for s in db_class.students)
+    response = client.get(f"/api/classes/{db_class.id}/students?limit=0")
+    assert response.status_code == 200
+    assert len(response.json) == 1
+    assert [s["id"] for s in _follow(client, f"/api/classes/{db_class.id}/students?limit=0")] == student_ids
+
+def test_class_list_limit_zero_is_clamped(client, db):
+    db.add_all([Class(name=name) for name in ("B", "A", "C")])
+    db.commit()
+    assert [c["name"] for c in _follow(client, "/api/classes/?limit=0")] == ["A", "B", "C"]
+
+def test_offset_pages_follow_keyset_order(client, db):
+    # Insertion (id) order differs from name order
+    names = [f"Class {n:02d}" for n in (7, 3, 9, 1, 5, 2, 8, 4, 6, 0)]
+    db.add_all([Class(name=name) for name in names])
+    db.commit()
+
+    first_page = client.get("/api/classes/?limit=4").json
+    second_page = client.get("/api/classes/?limit=4&skip=4").json
+    third_page = client.get("/api/classes/?limit=4&skip=8").json
+    assert [c["name"] for c in first_page + second_page + third_page] == sorted(names)
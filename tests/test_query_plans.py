@@ -0,0 +1,49 @@
+import re
+
+from sqlalchemy import event
+
+from app.crud import summary_crud
+from app.database import engine
+
+# Base tables the analytics queries read; a plain "SCAN <table>" on any of
+# them means the query walks the whole table instead of an index range.
+TABLES = ("classes", "students", "skills", "milestones", "class_skill_summary", "class_weighted_summary", "users")
+TABLE_SCAN = re.compile(r"^SCAN (%s)(?! USING)" % "|".join(TABLES))
+
+def _capture_selects(client, urls):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for url in urls:
+            assert client.get(url).status_code == 200, url
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+def test_analytics_endpoints_do_not_scan_tables(db, client, make_class):
+    db_class = make_class("Plans", [["Red", "Yellow", "Green", "Gold"], ["Gold", "Gold", "Red", "Red"], None])
+    summary_crud.rebuild_summary(db)
+    student_id = db_class.students[0].id
+
+    client.put(f"/api/students/{student_id}/skills/Reading", json={"new_status": "Gold"})
+    statements = _capture_selects(client, [
+        f"/api/analytics/class/{db_class.id}/by-skill",
+        f"/api/analytics/class/{db_class.id}/weighted-distribution",
+        f"/api/analytics/class/{db_class.id}/trends",
+        f"/api/analytics/class/{db_class.id}/trends?bucket=week",
+        f"/api/analytics/class/{db_class.id}/dashboard",
+        f"/api/analytics/student/{student_id}/comparison",
+    ])
+    assert statements
+
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            details = [row[-1] for row in plan]
+            scans = [detail for detail in details if TABLE_SCAN.match(detail)]
+            assert not scans, f"{statement}\n{details}"
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from app import read_routing
+from app.crud import summary_crud
+from app.database import Base, create_app_engine
+
+@pytest.fixture
+def lagging_replica(tmp_path, monkeypatch):
+    # A second SQLite file standing in for a replica that has not received
+    # any of the primary's data yet
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    replica_engine = create_app_engine(url)
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(read_routing, "DATABASE_READ_URL", url)
+    monkeypatch.setattr(read_routing, "ReadSessionLocal", scoped_session(sessionmaker(bind=replica_engine)))
+    yield
+    replica_engine.dispose()
+
+def _other_client(client):
+    # Same credentials, but none of the writer's read-your-writes state
+    from app.main import app
+    other = app.test_client()
+    other.environ_base.update(client.environ_base)
+    read_routing._recent_writes.clear()
+    return other
+
+def test_fill_after_write_reads_primary(db, client, make_class, lagging_replica):
+    db_class = make_class("Lag", [["Red", "Red", "Red", "Red"]])
+    summary_crud.rebuild_summary(db)
+    url = f"/api/analytics/class/{db_class.id}/by-skill"
+    student_id = db_class.students[0].id
+
+    assert client.put(f"/api/students/{student_id}/skills/Reading", json={"new_status": "Gold"}).status_code == 200
+
+    reader = _other_client(client)
+    first = reader.get(url)
+    assert first.headers["X-Cache"] == "MISS"
+    assert first.json["reading"] == {"red": 0, "yellow": 0, "green": 0, "gold": 1}
+    second = reader.get(url)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.data == first.data
+
+def test_fill_without_recent_write_uses_replica(db, client, make_class, lagging_replica, monkeypatch):
+    db_class = make_class("Settled", [["Gold", "Gold", "Gold", "Gold"]])
+    summary_crud.rebuild_summary(db)
+    student_id = db_class.students[0].id
+    client.put(f"/api/students/{student_id}/skills/Reading", json={"new_status": "Red"})
+
+    # Past the lag window the replica is trusted again
+    monkeypatch.setattr(read_routing, "READ_YOUR_WRITES_SECONDS", 0)
+    response = _other_client(client).get(f"/api/analytics/class/{db_class.id}/by-skill")
+    assert response.json["reading"] == {"red": 0, "yellow": 0, "green": 0, "gold": 0}
+
+def test_version_bumped_by_another_worker_invalidates(db, client, make_class):
+    from sqlalchemy import update
+    from app.models.cache_model import ResponseCacheVersion
+
+    db_class = make_class("Shared", [["Red", "Red", "Red", "Red"]])
+    class_id, student_id = db_class.id, db_class.students[0].id
+    url = f"/api/analytics/class/{class_id}/by-skill"
+    client.put(f"/api/students/{student_id}/skills/Reading", json={"new_status": "Gold"})
+    assert client.get(url).headers["X-Cache"] == "MISS"
+    assert client.get(url).headers["X-Cache"] == "HIT"
+
+    # Another process's write only touches the shared version row
+    db.execute(update(ResponseCacheVersion).values(version=ResponseCacheVersion.version + 1))
+    db.commit()
+    assert client.get(url).headers["X-Cache"] == "MISS"
+
+def test_student_hits_skip_the_student_lookup(db, client, make_class):
+    from sqlalchemy import event
+    from app.database import engine
+
+    db_class = make_class("Before", [["Red", "Red", "Red", "Red"], ["Gold", "Gold", "Gold", "Gold"]])
+    new_class_id = make_class("After", [["Green", "Green", "Green", "Green"]]).id
+    student_id = db_class.students[0].id
+    url = f"/api/analytics/student/{student_id}/comparison"
+    assert client.get(url).headers["X-Cache"] == "MISS"
+
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get(url).headers["X-Cache"] == "HIT"
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert not [s for s in statements if "FROM students" in s]
+
+    # A promotion retires the cached class, so the class averages follow the student
+    assert client.put(f"/api/students/{student_id}/promote", json={"new_class_id": new_class_id}).status_code == 200
+    response = client.get(url)
+    assert response.headers["X-Cache"] == "MISS"
+    assert {skill["class_average_score"] for skill in response.json} == {2.0}
@@ -0,0 +1,58 @@
+from app.crud import student_crud
+from app.models.school_models import Milestone, SkillStatus
+
+# Rows flushed together share one server-default timestamp, down to the second
+def _same_second_milestones(db, student_id, count):
+    milestones = [Milestone(student_id=student_id, skill_name="Reading", new_status=SkillStatus.GREEN) for _ in range(count)]
+    db.add_all(milestones)
+    db.commit()
+    assert len({m.timestamp for m in milestones}) == 1
+    return [m.id for m in milestones]
+
+def test_cursor_walks_same_second_milestones(db, make_class):
+    student_id = make_class("Keyset", [None]).students[0].id
+    ids = _same_second_milestones(db, student_id, 5)
+
+    pages, before = [], None
+    for _ in range(10):
+        rows, before = student_crud.get_student_milestones(db, student_id, before=before, limit=2)
+        pages.append([m.id for m in rows])
+        if before is None:
+            break
+    assert pages == [ids[:-3:-1], ids[-3:-5:-1], ids[:1]]
+
+def test_milestone_route_pages_without_repeats(client, db, make_class):
+    student_id = make_class("Keyset", [None]).students[0].id
+    ids = _same_second_milestones(db, student_id, 5)
+
+    seen, cursor = [], None
+    for _ in range(10):
+        response = client.get(f"/api/students/{student_id}/milestones?limit=2" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        seen.extend(m["id"] for m in response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == ids[::-1]
+
+def test_since_includes_the_boundary_second(db, make_class):
+    student_id = make_class("Keyset", [None]).students[0].id
+    ids = _same_second_milestones(db, student_id, 5)
+    stamped = db.get(Milestone, ids[0]).timestamp.replace(tzinfo=None)
+
+    rows, _ = student_crud.get_student_milestones(db, student_id, since=stamped)
+    assert sorted(m.id for m in rows) == ids
+    rows, _ = student_crud.get_student_milestones(db, student_id, until=stamped)
+    assert rows == []
+
+def test_cursor_from_another_student_is_rejected(client, db, make_class):
+    from app.pagination import encode_cursor
+
+    db_class = make_class("Keyset", [None, None])
+    student_id, other_id = db_class.students[0].id, db_class.students[1].id
+    _same_second_milestones(db, student_id, 3)
+    foreign = _same_second_milestones(db, other_id, 1)[0]
+
+    url = f"/api/students/{student_id}/milestones?limit=2"
+    for before in (foreign, 999999):
+        assert client.get(url + f"&cursor={encode_cursor([before])}").status_code == 422
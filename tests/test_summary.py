@@ -0,0 +1,49 @@
+import pytest
+
+from app.crud import summary_crud
+from app.database import SessionLocal
+from app.models.school_models import ClassSkillSummary, ClassWeightedSummary
+
+@pytest.mark.parametrize("bump", [summary_crud._bump, summary_crud._bump_portable])
+def test_bump_creates_then_increments(db, make_class, bump):
+    class_id = make_class("Bumps", []).id
+    bump(db, ClassSkillSummary, {"class_id": class_id, "skill_name": "Reading"}, "gold", 2)
+    bump(db, ClassSkillSummary, {"class_id": class_id, "skill_name": "Reading"}, "gold", 1)
+    bump(db, ClassSkillSummary, {"class_id": class_id, "skill_name": "Reading"}, "red", -1)
+    bump(db, ClassWeightedSummary, {"class_id": class_id}, "yellow", 1)
+    db.commit()
+
+    row = db.query(ClassSkillSummary).filter_by(class_id=class_id, skill_name="Reading").one()
+    assert (row.red, row.yellow, row.green, row.gold) == (-1, 0, 0, 3)
+    assert db.query(ClassWeightedSummary).filter_by(class_id=class_id).one().yellow == 1
+
+def test_bump_adds_to_row_created_by_another_transaction(db, make_class):
+    class_id = make_class("Race", []).id
+    # Another request created the row after this one decided it was missing
+    other = SessionLocal.session_factory()
+    try:
+        other.add(ClassSkillSummary(class_id=class_id, skill_name="Writing", red=1, yellow=0, green=0, gold=0))
+        other.commit()
+    finally:
+        other.close()
+
+    summary_crud._bump(db, ClassSkillSummary, {"class_id": class_id, "skill_name": "Writing"}, "red", 1)
+    db.commit()
+    assert db.query(ClassSkillSummary).filter_by(class_id=class_id, skill_name="Writing").one().red == 2
+
+def test_dashboard_matches_the_standalone_endpoints(db, client, make_class):
+    from app.models.school_models import Skill, SkillStatus
+
+    db_class = make_class("Dashboard", [["Red", "Gold", "Green", "Yellow"], ["Gold", "Gold", "Gold", "Gold"], None])
+    class_id = db_class.id
+    # A skill outside the four defaults
+    db.add(Skill(student_id=db_class.students[0].id, name="Grammar", current_status=SkillStatus.GREEN))
+    db.commit()
+    summary_crud.rebuild_summary(db)
+
+    response = client.get(f"/api/analytics/class/{class_id}/dashboard")
+    assert response.status_code == 200
+    dashboard = response.json
+    assert dashboard["by_skill"] == client.get(f"/api/analytics/class/{class_id}/by-skill").json
+    assert dashboard["by_skill"]["grammar"] == {"red": 0, "yellow": 0, "green": 1, "gold": 0}
+    assert dashboard["weighted_distribution"] == client.get(f"/api/analytics/class/{class_id}/weighted-distribution").json
@@ -0,0 +1,37 @@
+import random
+
+from app.crud import analytics_crud, summary_crud
+from app.crud.analytics_crud import SCORE_MAP, _map_score_to_category
+from app.models.school_models import Student
+
+STATUSES = ["Red", "Yellow", "Green", "Gold"]
+
+# The original Python implementation, kept as the reference the SQL must match
+def _reference_distribution(db, class_id):
+    distribution = {"red": 0, "yellow": 0, "green": 0, "gold": 0}
+    for student in db.query(Student).filter(Student.class_id == class_id).all():
+        if not student.skills:
+            score = 1.0
+        else:
+            score = sum(SCORE_MAP[skill.current_status] for skill in student.skills) / len(student.skills)
+        distribution[_map_score_to_category(score)] += 1
+    return distribution
+
+def test_sql_distribution_matches_python_reference(db, make_class):
+    rng = random.Random(20240501)
+    class_ids = []
+    for index in range(25):
+        # 0-4 skills per student; no skills must count as red
+        statuses = [[rng.choice(STATUSES) for _ in range(rng.randint(0, 4))] for _ in range(rng.randint(0, 15))]
+        class_ids.append(make_class(f"Random {index}", statuses).id)
+    summary_crud.rebuild_summary(db)
+
+    computed = analytics_crud.compute_weighted_distributions(db, class_ids)
+    for class_id in class_ids:
+        expected = _reference_distribution(db, class_id)
+        assert computed[class_id] == expected
+        assert analytics_crud.get_weighted_student_distribution(db, class_id) == expected
+
+def test_student_without_skills_counts_as_red(db, make_class):
+    db_class = make_class("Empty", [None, None])
+    assert analytics_crud.compute_weighted_distributions(db, [db_class.id])[db_class.id] == {"red": 2, "yellow": 0, "green": 0, "gold": 0}